@@ -1,4 +1,6 @@
+import os
 from pathlib import Path
+from typing import Dict
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -26,16 +28,94 @@ class Settings(BaseSettings):
 
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
+    # verified tokens are reused until they expire (JWT_CACHE_TTL for tokens
+    # without an exp); rejected ones are refused from memory for
+    # JWT_NEGATIVE_CACHE_TTL seconds, 0 to always recheck them
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_TTL: float = 300
+    JWT_NEGATIVE_CACHE_SIZE: int = 1000
+    JWT_NEGATIVE_CACHE_TTL: float = 30
+    # trust the name in the token for chat instead of reading it from the
+    # database on every websocket connect
+    WS_AUTH_CLAIMS_ONLY: bool = False
+
+    # bcrypt cost; stored hashes below it are rehashed on the next login
+    PASSWORD_HASH_ROUNDS: int = 12
+    # bcrypt runs on this many threads; past PASSWORD_HASH_MAX_PENDING calls
+    # waiting or running, logins and password changes get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Postgres connection budget, split evenly across every process that
+    # opens the engine: WEB_CONCURRENCY web workers plus DB_WORKER_PROCESSES
+    # dramatiq processes (dockerfile.dramatiq starts 4). The reserve is left
+    # for migrations and manual sessions
+    DB_MAX_CONNECTIONS: int = 100
+    DB_RESERVED_CONNECTIONS: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 280
+    # the sync engine only serves email and schema upgrade jobs
+    DB_SYNC_POOL_SIZE: int = 2
+    DB_WORKER_PROCESSES: int = 4
+    WEB_CONCURRENCY: int = os.cpu_count() or 1
 
     # Rate Limiting
     RATE_LIMIT_STANDARD: int
     RATE_LIMIT_SENSITIVE: int
     RATE_LIMIT_WINDOW: int
+    # each worker admits up to RATE_LIMIT_LOCAL_BATCH requests per client on
+    # its own before syncing them to Redis, at least every
+    # RATE_LIMIT_SYNC_INTERVAL seconds; clients within that many requests of
+    # their limit are always checked in Redis. 0 checks every request there.
+    # Workers don't share unsynced counts, so with N workers a client can get
+    # up to about N * RATE_LIMIT_LOCAL_BATCH requests past its limit
+    RATE_LIMIT_LOCAL_BATCH: int = 5
+    RATE_LIMIT_SYNC_INTERVAL: float = 1
+    RATE_LIMIT_LOCAL_SIZE: int = 10000
+    # when Redis is unreachable: admit requests (True) or answer 503 (False)
+    RATE_LIMIT_FAIL_OPEN: bool = True
+    # proxies in front of the app that append to X-Forwarded-For; 0 trusts
+    # none and keys anonymous clients by the peer address
+    RATE_LIMIT_TRUSTED_PROXY_HOPS: int = 0
+    # limit overrides by limiter key, e.g. {"auth:login": 20}, and per-role
+    # multipliers for signed-in users, e.g. {"Admin": 5}
+    RATE_LIMIT_ROUTE_QUOTAS: Dict[str, int] = {}
+    RATE_LIMIT_ROLE_QUOTAS: Dict[str, float] = {}
 
     # Caching
     CACHE_EXPIRY_SYLLABUS: int
     CACHE_EXPIRY_STUDENT: int
     CACHE_EXPIRY_BATCH: int
+    CACHE_EXPIRY_USER_NAME: int = 3600
+    USER_NAME_LOCAL_CACHE_SIZE: int = 10000
+    USER_NAME_LOCAL_CACHE_TTL: int = 60
+    CACHE_LOCAL_SIZE: int = 1024
+    CACHE_LOCAL_TTL: float = 5
+    # entries are served stale this long past their TTL while one caller
+    # refreshes them; rebuilds wait this long on another worker's lock
+    CACHE_STALE_TTL: int = 300
+    CACHE_LOCK_TIMEOUT: float = 10
+    # cached payloads from this size up are zlib-compressed in Redis; 0 turns
+    # compression off
+    CACHE_COMPRESS_MIN_BYTES: int = 4096
+    CACHE_COMPRESS_LEVEL: int = 1
+    # hot keys are warmed on startup, this many at a time, holding startup
+    # back at most CACHE_WARMUP_DEADLINE seconds; 0 skips the warm-up
+    CACHE_WARMUP_CONCURRENCY: int = 2
+    CACHE_WARMUP_DEADLINE: float = 5
+    CACHE_REWARM_ON_INVALIDATE: bool = False
+
+    # JSON and text responses from this size up are sent gzip or brotli
+    # compressed when the client accepts it; 0 turns compression off
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
+
+    # Request timing logs: a sampled share of requests, plus every slow one
+    REQUEST_TIMING_LOG_SAMPLE_RATE: float = 0.01
+    REQUEST_TIMING_SLOW_MS: int = 1000
+    # dev only: warn when a request repeats one statement more than this; 0 = off
+    SQL_REPEAT_WARN_THRESHOLD: int = 0
 
 
 settings = Settings()
@@ -1,16 +1,22 @@
 import os
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 import traceback
 import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import (
     sessionmaker,
     Session
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import settings
 from app.utils.constants import (
     PUBLIC_SCHEMA
 )
+from app.utils.metrics import metrics
+from app.utils.request_timing import current_request_timing, instrument_engine
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -19,18 +25,121 @@ SQL_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 SQL_HOST = os.getenv("POSTGRES_HOST")
 SQL_DB = os.getenv("POSTGRES_DB")
 SQLALCHEMY_DATABASE_URL = f"postgresql://{SQL_USER}:{SQL_PASSWORD}@{SQL_HOST}/{SQL_DB}"
+SQLALCHEMY_ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{SQL_USER}:{SQL_PASSWORD}@{SQL_HOST}/{SQL_DB}"
+)
 
 db_connections: dict[str, dict[str, Session | datetime]] = {}
 
+
+def compute_pool_sizes(
+    max_connections: int, reserved: int, processes: int, sync_pool_size: int
+) -> tuple[int, int]:
+    """
+    Split the connection budget across processes, returning the per-process
+    (sync, async) pool sizes. Overflow stays disabled so the budget holds.
+    """
+    per_process = max(1, (max_connections - reserved) // max(1, processes))
+    sync_size = max(1, min(sync_pool_size, per_process // 2))
+    return sync_size, max(1, per_process - sync_size)
+
+
+# web workers and dramatiq processes import the same engines, so each gets
+# an equal share whichever kind it is
+SYNC_POOL_SIZE, ASYNC_POOL_SIZE = compute_pool_sizes(
+    settings.DB_MAX_CONNECTIONS,
+    settings.DB_RESERVED_CONNECTIONS,
+    settings.WEB_CONCURRENCY + settings.DB_WORKER_PROCESSES,
+    settings.DB_SYNC_POOL_SIZE,
+)
+
+
+class _TimedCheckoutMixin:
+    """
+    Times pool checkouts, including the wait for a free connection, which
+    the pool events don't cover.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa.exc.TimeoutError:
+            metrics.counter(f"db.pool.{self.metrics_name}.timeouts").inc()
+            raise
+        finally:
+            metrics.histogram(f"db.pool.{self.metrics_name}.checkout_seconds").observe(
+                time.perf_counter() - start
+            )
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
 # Create a SQLAlchemy engine
 engine = sa.create_engine(
     SQLALCHEMY_DATABASE_URL,
     echo=False,
+    poolclass=TimedQueuePool,
     pool_pre_ping=True,
-    pool_recycle=280,
-    pool_size=200,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_size=SYNC_POOL_SIZE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     max_overflow=0,
 )
+# Create the asyncpg backed engine used by the request handling services
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    echo=False,
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_size=ASYNC_POOL_SIZE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    max_overflow=0,
+)
+
+
+def _instrument_pool(sync_engine: sa.Engine, name: str) -> None:
+    pool = sync_engine.pool
+    prefix = f"db.pool.{name}"
+    metrics.gauge(f"{prefix}.size", pool.size)
+    metrics.gauge(f"{prefix}.checked_out", pool.checkedout)
+    metrics.gauge(f"{prefix}.idle", pool.checkedin)
+
+    @sa.event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # record_info survives reconnects of the same pool slot, so a second
+        # connect means the old connection was recycled or invalidated
+        record_info = connection_record.record_info
+        if not record_info.get("connected"):
+            record_info["connected"] = True
+            metrics.counter(f"{prefix}.connects").inc()
+        elif record_info.pop("invalidated", False):
+            metrics.counter(f"{prefix}.reconnects_after_invalidation").inc()
+        else:
+            metrics.counter(f"{prefix}.recycled").inc()
+
+    @sa.event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        connection_record.record_info["invalidated"] = True
+        metrics.counter(f"{prefix}.invalidated").inc()
+
+    @sa.event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.counter(f"{prefix}.checkouts").inc()
+
+
+_instrument_pool(engine, TimedQueuePool.metrics_name)
+_instrument_pool(async_engine.sync_engine, TimedAsyncQueuePool.metrics_name)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # Create a base class for declarative models
 Base = declarative_base(metadata=sa.MetaData())
 
@@ -41,28 +150,101 @@ class SchemaNotFoundError(Exception):
         super().__init__(self.message)
 
 
+# execution option carrying the tenant schema of a session's bind
+TENANT_SCHEMA_OPTION = "tenant_schema"
+# key in the pooled connection's info dict holding its current search_path
+SEARCH_PATH_INFO_KEY = "search_path"
+
+# prebuilt session factories per tenant schema
+session_factories: dict[str, sessionmaker] = {}
+async_session_factories: dict[str, async_sessionmaker] = {}
+
+
+def _set_search_path(dbapi_connection, info: dict, schema: str) -> None:
+    """
+    Set search_path outside of any transaction, so a later rollback can't undo
+    it, and remember it on the pooled connection.
+    """
+    autocommit = dbapi_connection.autocommit
+    dbapi_connection.autocommit = True
+    cursor = dbapi_connection.cursor()
+    cursor.execute('set search_path to "%s"' % schema)
+    cursor.close()
+    dbapi_connection.autocommit = autocommit
+    info[SEARCH_PATH_INFO_KEY] = schema
+
+
+@sa.event.listens_for(engine, "connect")
+@sa.event.listens_for(async_engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _set_search_path(dbapi_connection, connection_record.info, PUBLIC_SCHEMA)
+
+
+@sa.event.listens_for(Session, "after_begin")
+def _on_session_begin(session, transaction, connection):
+    schema = connection.get_execution_options().get(TENANT_SCHEMA_OPTION)
+    pooled_connection = connection.connection
+    if schema and pooled_connection.info.get(SEARCH_PATH_INFO_KEY) != schema:
+        _set_search_path(
+            pooled_connection.dbapi_connection, pooled_connection.info, schema
+        )
+
+
+def _tenant_execution_options(schema: str) -> dict:
+    if not schema:
+        raise SchemaNotFoundError(schema)
+    return {
+        "schema_translate_map": dict(tenant=schema),
+        TENANT_SCHEMA_OPTION: schema,
+    }
+
+
+def get_session_factory(schema: str) -> sessionmaker:
+    factory = session_factories.get(schema)
+    if factory is None:
+        connectable = engine.execution_options(**_tenant_execution_options(schema))
+        factory = session_factories.setdefault(
+            schema, sessionmaker(bind=connectable, expire_on_commit=False)
+        )
+    return factory
+
+
+def get_async_session_factory(schema: str) -> async_sessionmaker:
+    factory = async_session_factories.get(schema)
+    if factory is None:
+        connectable = async_engine.execution_options(
+            **_tenant_execution_options(schema)
+        )
+        factory = async_session_factories.setdefault(
+            schema, async_sessionmaker(bind=connectable, expire_on_commit=False)
+        )
+    return factory
+
+
 def get_database():
     return build_db_session(PUBLIC_SCHEMA)
 
 
 def build_db_session(schema: str) -> Session:
-    if schema:
-        schema_translate_map = dict(tenant=schema)
-    else:
-        raise SchemaNotFoundError("Schema %s not found!" % schema)
-    connectable = engine.execution_options(schema_translate_map=schema_translate_map)
-    connectable.dialect.default_schema_name = schema
-    db = sessionmaker(bind=connectable, expire_on_commit=False)()
-    db.execute(sa.text('set search_path to "%s"' % schema))
-    return db
+    return get_session_factory(schema)()
+
+
+def get_async_database() -> AsyncSession:
+    return build_async_db_session(PUBLIC_SCHEMA)
+
+
+def build_async_db_session(schema: str) -> AsyncSession:
+    return get_async_session_factory(schema)()
 
 
 def get_connected_schema(db: Session) -> str:
-    return db.connection().dialect.default_schema_name or ""
+    return db.get_bind().get_execution_options().get(TENANT_SCHEMA_OPTION) or ""
 
 
 def get_db():
-    print("Transaction starting, opening db. ", datetime.now())
+    timing = current_request_timing.get()
+    if timing is not None:
+        timing.open_db_session()
     db = get_database()
     try:
         yield db
@@ -74,4 +256,24 @@ def get_db():
             db.rollback()
         finally:
             db.close()
-        print("Transaction completed, closing db. ", datetime.now())
+            if timing is not None:
+                timing.close_db_session()
+
+
+async def get_async_db():
+    timing = current_request_timing.get()
+    if timing is not None:
+        timing.open_db_session()
+    db = get_async_database()
+    try:
+        yield db
+    finally:
+        try:
+            await db.commit()
+        except:
+            traceback.print_exc()
+            await db.rollback()
+        finally:
+            await db.close()
+            if timing is not None:
+                timing.close_db_session()
@@ -1,17 +1,28 @@
 from datetime import datetime
+from typing import Tuple
 
 from pydantic import field_validator
 import sqlalchemy as sa
 
 from app.connectors.database_connector import Base
 from app.utils.enums import GenderTypes, Roles
-from app.utils.hasher import Hasher
+from app.utils.hasher import Hasher, password_hasher
 from app.utils.validation import validate_password
 from sqlalchemy.orm import relationship
 
 
 class User(Base):
     __tablename__ = "users"
+    # trigram indexes backing the admin user search (requires pg_trgm)
+    __table_args__ = tuple(
+        sa.Index(
+            f"ix_users_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in ("name", "email", "phone_number")
+    )
 
     id: int = sa.Column(sa.Integer, primary_key=True, nullable=False)
     name: str = sa.Column(sa.String(50), nullable=False)
@@ -63,6 +74,25 @@ class User(Base):
     def verify_password(self, password: str):
         return Hasher.verify_password(password, self.__password)
 
+    async def set_password(self, password: str) -> None:
+        """
+        Same as assigning `password`, with the hashing done off the event loop.
+        """
+        self.__password = await password_hasher.hash(password)
+
+    async def verify_and_update_password(self, password: str) -> Tuple[bool, bool]:
+        """
+        (valid, rehashed): a valid password hashed with outdated settings is
+        rehashed in place, and the caller should save the user.
+        """
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, self.__password
+        )
+        if valid and new_hash:
+            self.__password = new_hash
+            return True, True
+        return valid, False
+
     @field_validator("password")
     def validate_user_creation_password(cls, password: str):
         return validate_password(password)
@@ -14,6 +14,8 @@ class GetApiResponse(BaseModel, Generic[T]):
     page: Optional[int] = None
     page_size: Optional[int] = None
     total_items: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: Optional[bool] = None
     data: T
 
 
@@ -41,10 +41,18 @@ class GetUserDetailsResponse(BaseModel):
 
 
 class CurrentContextUser:
-    id: int
-    name: str
-    email: str
-    role: str
+    """
+    The caller named by a verified access token, over HTTP and websockets
+    alike. Instances are cached and shared between requests; don't mutate.
+    """
+
+    __slots__ = ("id", "name", "email", "role")
+
+    def __init__(self, id: int, name: str, email: str, role: str):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
 
 
 class UserInfoResponse(BaseModel):
@@ -27,7 +27,7 @@ async def login(
     request: LoginRequest,
     service: AuthService = Depends(AuthService),
 ):
-    return ApiResponse(data=service.login(request))
+    return ApiResponse(data=await service.login(request))
 
 
 # ---------------- FORGOT PASSWORD (RATE LIMITED) ----------------
@@ -41,7 +41,7 @@ async def forgot_password(
     request: ForgotPasswordRequest,
     service: AuthService = Depends(AuthService),
 ):
-    return ApiResponse(data=service.forgot_password(request.email))
+    return ApiResponse(data=await service.forgot_password(request.email))
 
 
 # ---------------- RESET PASSWORD (RATE LIMITED) ----------------
@@ -56,7 +56,7 @@ async def reset_password(
     service: AuthService = Depends(AuthService),
 ):
     return ApiResponse(
-        data=service.reset_password(
+        data=await service.reset_password(
             token=request.token,
             new_password=request.new_password,
         )
@@ -73,4 +73,4 @@ async def register(
     request: RegisterRequest,
     service: AuthService = Depends(AuthService),
 ):
-    return ApiResponse(data=service.register(request))
+    return ApiResponse(data=await service.register(request))
@@ -1,11 +1,12 @@
-from typing import List
+from typing import List, Optional
 from unittest import result
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from pydantic import PositiveInt
 
 from app.models.base_response_model import (
     ApiResponse,
     CreateResponse,
+    GetApiResponse,
     SuccessMessageResponse,
 )
 from app.models.batch_models import (
@@ -17,6 +18,8 @@ from app.models.batch_models import (
     GetChatMessageResponse,
 )
 from app.services.batch_service import BatchService
+from app.utils.constants import DEFAULT_LIST_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.helpers import conditional_response
 from app.utils.rate_limiter import rate_limiter
 from app.config import settings
 
@@ -44,15 +47,18 @@ async def create_batch(
 # ---------------- GET ALL BATCHES (NO RATE LIMIT – CACHED) ----------------
 @router.get(
     "",
-    response_model=ApiResponse[List[GetBatchResponse]],
+    response_model=GetApiResponse[List[GetBatchResponse]],
     status_code=status.HTTP_200_OK,
     summary="Retrieve all batches",
 )
 async def get_all_batches(
+    request: Request,
+    cursor: Optional[str] = Query(default=None),
+    page_size: PositiveInt = Query(default=DEFAULT_LIST_PAGE_SIZE, le=MAX_PAGE_SIZE),
     service: BatchService = Depends(BatchService),
 ):
-    data = await service.get_all_batches()  # 🔥 MUST await
-    return ApiResponse(data=data)
+    response = await service.get_all_batches(cursor, page_size)
+    return conditional_response(request, response)
 
 
 # ---------------- GET BATCH BY ID (NO RATE LIMIT – CACHED) ----------------
@@ -85,7 +91,7 @@ async def update_batch_by_id(
 ) -> ApiResponse[CreateResponse]:
     logged_in_user_id = request_state.state.user.id
 
-    result = service.update_batch_by_id(batch_id, request, logged_in_user_id)
+    result = await service.update_batch_by_id(batch_id, request, logged_in_user_id)
     return ApiResponse(data=result)
 
 
@@ -101,7 +107,7 @@ async def delete_batch_by_id(
     batch_id: PositiveInt,
     service: BatchService = Depends(BatchService),
 ) -> ApiResponse[CreateResponse]:
-    return ApiResponse(data=service.delete_batch_by_id(batch_id))
+    return ApiResponse(data=await service.delete_batch_by_id(batch_id))
 
 
 # ---------------- CREATE CLASS SCHEDULE (RATE LIMITED) ----------------
@@ -118,7 +124,7 @@ async def create_class_schedule(
     service: BatchService = Depends(BatchService),
 ) -> ApiResponse[CreateResponse]:
     user_id = request_state.state.user.id
-    return ApiResponse(data=service.create_schedule(batch_id, request, user_id))
+    return ApiResponse(data=await service.create_schedule(batch_id, request, user_id))
 
 
 # ---------------- GET CLASS SCHEDULES (NO RATE LIMIT – CACHED) ----------------
@@ -170,20 +176,32 @@ async def delete_class_schedule_by_id(
     batch_id: PositiveInt,
     service: BatchService = Depends(BatchService),
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.delete_schedule_by_id(schedule_id, batch_id))
+    return ApiResponse(
+        data=await service.delete_schedule_by_id(schedule_id, batch_id)
+    )
 
 
 
 # ---------------- GET CHAT HISTORY ----------------
 @router.get(
     "/{batch_id}/chats",
-    response_model=ApiResponse[List[GetChatMessageResponse]],
+    response_model=GetApiResponse[List[GetChatMessageResponse]],
     status_code=status.HTTP_200_OK,
     summary="Retrieve chat history for a batch",
 )
 async def get_batch_chat_history(
     batch_id: PositiveInt,
     request_state: Request,
+    cursor: Optional[str] = Query(default=None),
+    page_size: PositiveInt = Query(default=DEFAULT_LIST_PAGE_SIZE, le=MAX_PAGE_SIZE),
     service: BatchService = Depends(BatchService),
-) -> ApiResponse[List[GetChatMessageResponse]]:
-    return ApiResponse(data=service.get_chat_history(batch_id, request_state.state.user))
+) -> GetApiResponse[List[GetChatMessageResponse]]:
+    data, next_cursor = await service.get_chat_history(
+        batch_id, request_state.state.user, cursor, page_size
+    )
+    return GetApiResponse(
+        page_size=page_size,
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None,
+        data=data,
+    )
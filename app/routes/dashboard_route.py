@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from app.connectors.database_connector import get_db
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.connectors.database_connector import get_async_db
 from app.services.dashboard_service import DashboardService
 from app.models.dashboard_models import DashboardStatsResponse
 from app.models.base_response_model import ApiResponse
+from app.utils.cache import generations_etag
+from app.utils.helpers import etag_matches, not_modified
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -15,8 +17,19 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
     summary="Get dashboard statistics",
 )
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
-) -> ApiResponse[DashboardStatsResponse]:
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # the stats only move when users or batches are written, or when the
+    # year they report on rolls over; read the generations first so a
+    # concurrent write can only make the ETag stale
+    year = DashboardService.current_year()
+    etag = await generations_etag(*DashboardService.DEPENDS_ON, context=f"year={year}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     service = DashboardService(db)
-    data = await service.get_stats()
+    data = await service.get_stats(year)
+    response.headers["ETag"] = etag
     return ApiResponse(data=data)
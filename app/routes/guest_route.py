@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from pydantic import PositiveInt
+from typing import List, Optional
 
-from app.models.base_response_model import ApiResponse, SuccessMessageResponse
+from app.models.base_response_model import (
+    ApiResponse,
+    GetApiResponse,
+    SuccessMessageResponse,
+)
 from app.models.guest_models import GuestRequest, GetGuestResponse
 from app.services.guest_service import GuestService
+from app.utils.constants import DEFAULT_LIST_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 router = APIRouter(
@@ -22,20 +28,27 @@ async def create_guest(
     request: GuestRequest,
     service: GuestService = Depends(GuestService),
 ):
-    data = service.create_guest(request)
+    data = await service.create_guest(request)
     return ApiResponse(data=data)
 
 
 # ---------------- GET ALL GUESTS ----------------
 @router.get(
     "",
-    response_model=ApiResponse[List[GetGuestResponse]],
+    response_model=GetApiResponse[List[GetGuestResponse]],
 )
 async def get_all_guests(
+    cursor: Optional[str] = Query(default=None),
+    page_size: PositiveInt = Query(default=DEFAULT_LIST_PAGE_SIZE, le=MAX_PAGE_SIZE),
     service: GuestService = Depends(GuestService),
 ):
-    data = service.get_all_guests()
-    return ApiResponse(data=data)
+    data, next_cursor = await service.get_all_guests(cursor, page_size)
+    return GetApiResponse(
+        page_size=page_size,
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None,
+        data=data,
+    )
 
 
 # ---------------- GET GUEST BY ID ----------------
@@ -47,7 +60,7 @@ async def get_guest_by_id(
     guest_id: int,
     service: GuestService = Depends(GuestService),
 ):
-    data = service.get_guest_by_id(guest_id)
+    data = await service.get_guest_by_id(guest_id)
     return ApiResponse(data=data)
 
 
@@ -60,5 +73,5 @@ async def delete_guest(
     guest_id: int,
     service: GuestService = Depends(GuestService),
 ):
-    data = service.delete_guest(guest_id)
+    data = await service.delete_guest(guest_id)
     return ApiResponse(data=data)
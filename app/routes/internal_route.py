@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, status
+
+from app.models.base_response_model import ApiResponse
+from app.utils.auth_dependencies import require_roles
+from app.utils.enums import Roles
+from app.utils.metrics import metrics
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["INTERNAL"],
+    dependencies=[Depends(require_roles(Roles.Admin, Roles.SuperAdmin))],
+)
+
+
+@router.get(
+    "/metrics",
+    response_model=ApiResponse[dict],
+    status_code=status.HTTP_200_OK,
+    summary="Process-local metrics of the worker serving the request",
+)
+async def get_metrics() -> ApiResponse[dict]:
+    return ApiResponse(data=metrics.snapshot())
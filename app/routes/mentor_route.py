@@ -29,7 +29,7 @@ async def create_mentor_profile(
 ) -> ApiResponse[SuccessMessageResponse]:
 
     logged_in_user_id = request_state.state.user.id
-    data = service.create_mentor_profile(request, logged_in_user_id)
+    data = await service.create_mentor_profile(request, logged_in_user_id)
     return ApiResponse(data=data)
 
 
@@ -44,5 +44,5 @@ async def get_mentor_profile(
     service: MentorService = Depends(MentorService),
 ) -> ApiResponse[GetMentorProfileResponse]:
 
-    data = service.get_mentor_profile_by_user_id(user_id)
+    data = await service.get_mentor_profile_by_user_id(user_id)
     return ApiResponse(data=data)
@@ -8,6 +8,7 @@ from . import (
     guest_route,
 
     admin_route,
+    internal_route,
 )
 
 
@@ -22,6 +23,7 @@ PROTECTED_ROUTES = [
 
     mentor_route.router,
     admin_route.router,
+    internal_route.router,
 ]
 
 
@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from pydantic import PositiveInt
 
-from app.models.base_response_model import ApiResponse, SuccessMessageResponse
+from app.models.base_response_model import (
+    ApiResponse,
+    GetApiResponse,
+    SuccessMessageResponse,
+)
 from app.models.student_models import (
     GetMappedBatchStudentResponse,
     MapStudentToBatchRequest,
@@ -12,6 +16,8 @@ from app.models.student_models import (
     UpdatedBatchStudentRequest,
 )
 from app.services.student_service import StudentService
+from app.utils.constants import DEFAULT_LIST_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.helpers import conditional_response
 from app.utils.rate_limiter import rate_limiter
 from app.config import settings
 
@@ -32,22 +38,24 @@ async def create_student(
     service: StudentService = Depends(StudentService),
 ) -> ApiResponse[SuccessMessageResponse]:
     logged_in_user_id = request_state.state.user.id
-    return ApiResponse(data=service.create_student(request, logged_in_user_id))
+    return ApiResponse(data=await service.create_student(request, logged_in_user_id))
 
 
 # ---------------- GET ALL STUDENTS (NO RATE LIMIT – CACHED) ----------------
 @router.get(
     "",
-    response_model=ApiResponse[List[GetStudentResponse]],
+    response_model=GetApiResponse[List[GetStudentResponse]],
     status_code=status.HTTP_200_OK,
     summary="Retrieve all students",
 )
 async def get_all_students(
+    request: Request,
+    cursor: Optional[str] = Query(default=None),
+    page_size: PositiveInt = Query(default=DEFAULT_LIST_PAGE_SIZE, le=MAX_PAGE_SIZE),
     service: StudentService = Depends(StudentService),
-) -> ApiResponse[List[GetStudentResponse]]:
-
-    data = await service.get_all_students()  # ✅ await
-    return ApiResponse(data=data)
+):
+    response = await service.get_all_students(cursor, page_size)
+    return conditional_response(request, response)
 
 
 # ---------------- GET STUDENT BY ID (NO RATE LIMIT – CACHED) ----------------
@@ -117,8 +125,7 @@ async def get_batch_students(
     batch_id: PositiveInt,
     service: StudentService = Depends(StudentService),
 ):
-    data = await service.get_batch_students(batch_id)
-    return ApiResponse(data=data)
+    return await service.get_batch_students(batch_id)
 
 
 # ---------------- GET BATCH STUDENT BY ID (NO RATE LIMIT – CACHED) ----------------
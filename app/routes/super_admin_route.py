@@ -26,7 +26,7 @@ async def create_user(
 ) -> ApiResponse[UserCreationResponse]:
 
     response = mapper.to(UserCreationResponse).map(
-        service.create_user(request, http_request)
+        await service.create_user(http_request.state.user.id, request)
     )
     return ApiResponse(data=response)
 
@@ -39,4 +39,4 @@ async def create_user(
 async def get_user_by_id(
     user_id: int, service: UserService = Depends(UserService)
 ) -> ApiResponse[GetUserDetailsResponse]:
-    return ApiResponse(data=service.get_user_by_id(user_id))
+    return ApiResponse(data=await service.get_user_by_id(user_id))
@@ -5,6 +5,7 @@ from pydantic import PositiveInt
 from app.models.base_response_model import ApiResponse, SuccessMessageResponse
 from app.models.syllabus_models import GetSyllabusResponse, SyllabusRequest
 from app.services.syllabus_service import SyllabusService
+from app.utils.helpers import conditional_response
 from app.utils.rate_limiter import rate_limiter
 from app.config import settings
 
@@ -25,7 +26,7 @@ async def create_syllabus(
     service: SyllabusService = Depends(SyllabusService),
 ) -> ApiResponse[SuccessMessageResponse]:
     logged_in_user_id = request_state.state.user.id
-    return ApiResponse(data=service.create_syllabus(request, logged_in_user_id))
+    return ApiResponse(data=await service.create_syllabus(request, logged_in_user_id))
 
 
 # ---------------- GET ALL SYLLABUS (NO RATE LIMIT – CACHED) ----------------
@@ -36,9 +37,10 @@ async def create_syllabus(
     summary="Retrieve all syllabus",
 )
 async def get_all_syllabus(
+    request: Request,
     service: SyllabusService = Depends(SyllabusService),
-) -> ApiResponse[List[GetSyllabusResponse]]:
-    return ApiResponse(data=await service.get_all_syllabus())
+):
+    return conditional_response(request, await service.get_all_syllabus())
 
 
 # ---------------- GET SYLLABUS BY ID (NO RATE LIMIT – CACHED) ----------------
@@ -71,7 +73,9 @@ async def update_syllabus_by_id(
 ) -> ApiResponse[SuccessMessageResponse]:
     logged_in_user_id = request_state.state.user.id
     return ApiResponse(
-        data=service.update_syllabus_by_id(syllabus_id, request, logged_in_user_id)
+        data=await service.update_syllabus_by_id(
+            syllabus_id, request, logged_in_user_id
+        )
     )
 
 
@@ -87,4 +91,4 @@ async def delete_syllabus_by_id(
     syllabus_id: PositiveInt,
     service: SyllabusService = Depends(SyllabusService),
 ) -> ApiResponse[SuccessMessageResponse]:
-    return ApiResponse(data=service.delete_syllabus_by_id(syllabus_id))
+    return ApiResponse(data=await service.delete_syllabus_by_id(syllabus_id))
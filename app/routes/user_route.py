@@ -13,7 +13,7 @@ from app.models.user_models import (
 )
 from app.services.user_service import UserService
 from app.utils.constants import UPDATED_AT
-from app.utils.enums import OrderByTypes
+from app.utils.enums import CountModes, OrderByTypes
 
 
 router = APIRouter(prefix="/users", tags=["USER MANAGEMENT SERVICE"])
@@ -30,7 +30,7 @@ async def create_user(
     service: UserService = Depends(UserService),
 ) -> ApiResponse[UserCreationResponse]:
     logged_in_user_id = request_state.state.user.id
-    return ApiResponse(data=service.create_user(logged_in_user_id, request))
+    return ApiResponse(data=await service.create_user(logged_in_user_id, request))
 
 
 @router.put(
@@ -45,7 +45,9 @@ async def update_user(
     service: UserService = Depends(UserService),
 ) -> ApiResponse[UserCreationResponse]:
     logged_in_user_id = request_state.state.user.id
-    return ApiResponse(data=service.update_user(user_id, request, logged_in_user_id))
+    return ApiResponse(
+        data=await service.update_user(user_id, request, logged_in_user_id)
+    )
 
 
 @router.get(
@@ -61,9 +63,11 @@ async def get_all_users(
     order_by: Optional[OrderByTypes] = OrderByTypes.DESC,
     page: Optional[PositiveInt] = Query(default=1),
     page_size: Optional[PositiveInt] = Query(default=10),
+    cursor: Optional[str] = Query(default=None),
+    count_mode: CountModes = Query(default=CountModes.EXACT),
     service: UserService = Depends(UserService),
 ) -> GetApiResponse[List[GetUserDetailsResponse]]:
-    total_count, response = service.get_all_users(
+    total_count, response, next_cursor = await service.get_all_users(
         search=search,
         filter_by=filter_by,
         filter_values=filter_values,
@@ -71,12 +75,16 @@ async def get_all_users(
         order_by=order_by,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        count_mode=count_mode,
     )
 
     return GetApiResponse(
         total_items=total_count,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None,
         data=response,
     )
 
@@ -89,7 +97,7 @@ async def get_all_users(
 async def get_user_by_id(
     user_id: int, service: UserService = Depends(UserService)
 ) -> ApiResponse[GetUserDetailsResponse]:
-    return ApiResponse(data=service.get_user_by_id(user_id))
+    return ApiResponse(data=await service.get_user_by_id(user_id))
 
 
 @router.get(
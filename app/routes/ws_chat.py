@@ -2,10 +2,12 @@
 from datetime import datetime
 import uuid
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
 
-from app.services.authorization import verify_ws_token
+from app.config import settings
+from app.utils.auth_dependencies import verify_auth_token_ws
 from app.services.manager import manager
-from app.connectors.database_connector import get_database
+from app.connectors.database_connector import get_async_database
 from app.entities.chat import ChatMessage
 from app.entities.user import User
 from app.entities.batch import Batch
@@ -17,23 +19,26 @@ router = APIRouter(tags=["BATCH CHAT"])
 
 @router.websocket("/ws/chat/batch/{batch_id}")
 async def batch_chat(websocket: WebSocket, batch_id: int):
-    user = await verify_ws_token(websocket)
+    user = await verify_auth_token_ws(websocket)
 
     if not user:
-        await websocket.close(code=1008)
         return
 
     # ---------------- AUTHORIZATION CHECK ----------------
-    db = get_database()
+    db = get_async_database()
     is_authorized = False
     try:
-        user_role = user.get("role")
-        user_id = user.get("user_id")
+        user_role = user.role
+        user_id = user.id
+        user_name = user.name
 
         # Fetch fresh user details from DB to ensure name is up-to-date
-        current_user_db = db.query(User).filter(User.id == user_id).first()
-        if current_user_db:
-            user["name"] = current_user_db.name
+        if not settings.WS_AUTH_CLAIMS_ONLY:
+            current_user_db = await db.scalar(
+                select(User).where(User.id == user_id).limit(1)
+            )
+            if current_user_db:
+                user_name = current_user_db.name
 
         if user_role in ["Admin", "SuperAdmin"]:
             is_authorized = True
@@ -41,10 +46,10 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
         elif user_role == "Mentor":
 
             # Check if this mentor is assigned to the batch
-            batch = (
-                db.query(Batch)
-                .filter(Batch.id == batch_id, Batch.mentor == user_id)
-                .first()
+            batch = await db.scalar(
+                select(Batch)
+                .where(Batch.id == batch_id, Batch.mentor == user_id)
+                .limit(1)
             )
             if batch:
                 is_authorized = True
@@ -52,16 +57,18 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
         elif user_role == "Student":
 
             # Get student profile
-            student = db.query(Student).filter(Student.user_id == user_id).first()
+            student = await db.scalar(
+                select(Student).where(Student.user_id == user_id).limit(1)
+            )
             if student:
                 # Check enrollment
-                enrollment = (
-                    db.query(BatchStudent)
-                    .filter(
+                enrollment = await db.scalar(
+                    select(BatchStudent)
+                    .where(
                         BatchStudent.batch_id == batch_id,
                         BatchStudent.student_id == student.id,
                     )
-                    .first()
+                    .limit(1)
                 )
                 if enrollment:
                     is_authorized = True
@@ -70,17 +77,17 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
             print(
                 f"Unauthorized chat access: User {user_id} ({user_role}) -> Batch {batch_id}"
             )
-            db.close()
+            await db.close()
             await websocket.close(code=1008)
             return
 
     except Exception as e:
         print(f"Chat Auth Error: {e}")
-        db.close()
+        await db.close()
         await websocket.close(code=1011)
         return
 
-    db.close()
+    await db.close()
     # -----------------------------------------------------
     # -----------------------------------------------------
 
@@ -90,9 +97,9 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
     await websocket.send_json(
         {
             "type": "init",
-            "user_id": user["user_id"],
-            "user_name": user["name"],
-            "user_role": user["role"],
+            "user_id": user_id,
+            "user_name": user_name,
+            "user_role": user_role,
         }
     )
 
@@ -101,8 +108,8 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
         batch_id,
         {
             "type": "join",
-            "user_id": user["user_id"],
-            "user_name": user["name"],
+            "user_id": user_id,
+            "user_name": user_name,
             "timestamp": datetime.now().isoformat(),
         },
     )
@@ -116,17 +123,17 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
                 continue
 
             # Save message to database
-            db = get_database()
+            db = get_async_database()
             new_message = ChatMessage(
                 batch_id=batch_id,
-                user_id=user["user_id"],
+                user_id=user_id,
                 message=message_text,
                 timestamp=datetime.now(),
             )
             db.add(new_message)
-            db.commit()
-            db.refresh(new_message)
-            db.close()
+            await db.commit()
+            await db.refresh(new_message)
+            await db.close()
 
             await manager.broadcast(
                 batch_id,
@@ -134,9 +141,9 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
                     "type": "message",
                     "id": str(uuid.uuid4()),
                     "batch_id": batch_id,
-                    "user_id": user["user_id"],
-                    "user_name": user["name"],
-                    "user_role": user["role"],
+                    "user_id": user_id,
+                    "user_name": user_name,
+                    "user_role": user_role,
                     "message": message_text,
                     "timestamp": datetime.now().isoformat(),
                 },
@@ -149,8 +156,8 @@ async def batch_chat(websocket: WebSocket, batch_id: int):
             batch_id,
             {
                 "type": "leave",
-                "user_id": user["user_id"],
-                "user_name": user["name"],
+                "user_id": user_id,
+                "user_name": user_name,
                 "timestamp": datetime.now().isoformat(),
             },
         )
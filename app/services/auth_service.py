@@ -19,6 +19,7 @@ from app.utils.auth_dependencies import (
     ALGORITHM,
     SECRET_KEY,
 )
+from app.utils.db_queries import get_user_by_id
 from app.utils.constants import (
     INCORRECT_PASSWORD,
     USER_NOT_FOUND,
@@ -60,8 +61,8 @@ class AuthService:
             )
 
     # ---------------- LOGIN ----------------
-    def login(self, request: LoginRequest) -> LoginResponse:
-        user = self.user_service.get_active_user_by_email(request.email)
+    async def login(self, request: LoginRequest) -> LoginResponse:
+        user = await self.user_service.get_active_user_by_email(request.email)
 
         if not user:
             raise HTTPException(
@@ -69,11 +70,14 @@ class AuthService:
                 detail=USER_NOT_FOUND,
             )
 
-        if not user.verify_password(request.password):
+        valid, rehashed = await user.verify_and_update_password(request.password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=INCORRECT_PASSWORD,
             )
+        if rehashed:
+            await self.user_service.update(user)
 
         claims = self.create_claims(user)
         return self.generate_token_response(claims=claims)
@@ -82,11 +86,11 @@ class AuthService:
     # NEW: FORGOT PASSWORD
     # =========================================================
 
-    def forgot_password(self, email: str):
+    async def forgot_password(self, email: str):
         """
         Generate reset token and send email.
         """
-        user = self.user_service.get_active_user_by_email(email)
+        user = await self.user_service.get_active_user_by_email(email)
 
         # SECURITY: always return success
         if not user:
@@ -113,7 +117,7 @@ class AuthService:
     # =========================================================
     # NEW: RESET PASSWORD
     # =========================================================
-    def reset_password(self, token: str, new_password: str):
+    async def reset_password(self, token: str, new_password: str):
         """
         Validate reset token and update password.
         """
@@ -148,7 +152,7 @@ class AuthService:
                 detail=INVALID_RESET_TOKEN,
             )
 
-        user = self.user_service.get_user_by_id(user_id)
+        user = await get_user_by_id(self.user_service.db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -156,16 +160,16 @@ class AuthService:
             )
 
         # update password (hashed inside model/service)
-        user.password = new_password
-        self.user_service.update(user)
+        await user.set_password(new_password)
+        await self.user_service.update(user)
 
         return SuccessMessageResponse(message=PASSWORD_RESET_SUCCESSFULLY)
 
-    def register(self, request):
+    async def register(self, request):
         """
         Register a new user
         """
-        existing_user = self.user_service.get_active_user_by_email(request.email)
+        existing_user = await self.user_service.get_active_user_by_email(request.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -190,9 +194,9 @@ class AuthService:
             )
 
         # ✅ password hashing
-        user.password = request.password
+        await user.set_password(request.password)
 
         # ✅ persist
-        self.user_service.save(user)
+        await self.user_service.save(user)
 
         return SuccessMessageResponse(message=USER_REGISTERED_SUCCESSFULLY)
@@ -1,20 +1,25 @@
-from typing import List
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-import json
 
 from fastapi import Depends, status, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi.responses import Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.connectors.database_connector import get_db
+from app.config import settings
+from app.connectors.database_connector import get_async_db
 from app.entities.batch import Batch
 from app.entities.class_schedule import ClassSchedule
 from app.entities.batch_student import BatchStudent
-from app.entities.syllabus import Syllabus
 from app.entities.chat import ChatMessage
+from app.entities.syllabus import Syllabus
 from app.entities.user import User
-from app.entities.student import Student
-from app.models.base_response_model import CreateResponse, SuccessMessageResponse
+from app.models.base_response_model import (
+    CreateResponse,
+    GetApiResponse,
+    SuccessMessageResponse,
+)
 from app.models.batch_models import (
     BatchRequest,
     GetBatchResponse,
@@ -24,7 +29,16 @@ from app.models.batch_models import (
     ClassScheduleRequest,
     GetChatMessageResponse,
 )
+from app.utils.cache import (
+    ModelListSerializer,
+    ModelSerializer,
+    ResponseSerializer,
+    add_cache_tags,
+    cached,
+    invalidate_tags,
+)
 from app.utils.constants import (
+    DEFAULT_LIST_PAGE_SIZE,
     BATCH_CREATED_SUCCESSFULLY,
     BATCH_DELETED_SUCCESSFULLY,
     BATCH_NOT_FOUND,
@@ -38,26 +52,31 @@ from app.utils.constants import (
 )
 from app.utils.db_queries import (
     count_syllabus_by_ids,
-    get_all_batches,
     get_batch,
     get_batch_class_schedules,
     get_class_schedule_by_batch_and_time,
     get_class_schedule_by_id,
+    get_student_by_id,
+    get_student_in_batch,
+    get_syllabus_by_ids,
 )
-from app.utils.helpers import get_all_users_dict
+from app.utils.enums import OrderByTypes
+from app.utils.helpers import apply_keyset_pagination, split_keyset_page
 from app.utils.validation import validate_data_exits, validate_data_not_found
-from app.utils.redis_client import redis_client
+from app.utils.user_name_cache import user_name_resolver
 
 
 @dataclass
 class BatchService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
     # ---------------- CREATE BATCH ----------------
     async def create_batch(
         self, request: BatchRequest, logged_in_user_id: int
     ) -> CreateResponse:
-        existing_syllabus_ids = count_syllabus_by_ids(self.db, request.syllabus_ids)
+        existing_syllabus_ids = await count_syllabus_by_ids(
+            self.db, request.syllabus_ids
+        )
         if existing_syllabus_ids != len(request.syllabus_ids):
             validate_data_not_found(False, ONE_OR_MORE_SYLLABUS_NOT_FOUND)
 
@@ -72,25 +91,37 @@ class BatchService:
         )
 
         self.db.add(new_batch)
-        self.db.commit()
-        self.db.refresh(new_batch)
+        await self.db.commit()
+        await self.db.refresh(new_batch)
 
         print("BATCH OBJECT:", new_batch)
         print("BATCH ID:", new_batch.id)
 
         # cache invalidation
-        await redis_client.delete("cache:batches:all")
+        await invalidate_tags("batch:*")
 
         return CreateResponse(id=new_batch.id, message=BATCH_CREATED_SUCCESSFULLY)
 
     # ---------------- HELPER ----------------
-    def get_batch_response(self, batch: Batch) -> GetBatchResponse:
-        users = get_all_users_dict(self.db)
-        syllabus_details = (
-            self.db.query(Syllabus).filter(Syllabus.id.in_(batch.syllabus_ids)).all()
-        )
-
-        syllabus = [{s.name: s.topics} for s in syllabus_details]
+    async def get_syllabus_map(self, batches: List[Batch]) -> Dict[int, Syllabus]:
+        """
+        Fetch the syllabus of every given batch in a single query.
+        """
+        syllabus_ids = {sid for batch in batches for sid in batch.syllabus_ids or []}
+        if not syllabus_ids:
+            return {}
+        add_cache_tags(*(f"syllabus:{sid}" for sid in syllabus_ids))
+        syllabus = await get_syllabus_by_ids(self.db, list(syllabus_ids))
+        return {s.id: s for s in syllabus}
+
+    def get_batch_response(
+        self, batch: Batch, users: Dict[int, str], syllabus_map: Dict[int, Syllabus]
+    ) -> GetBatchResponse:
+        syllabus = [
+            {syllabus_map[sid].name: syllabus_map[sid].topics}
+            for sid in dict.fromkeys(batch.syllabus_ids or [])
+            if sid in syllabus_map
+        ]
 
         return GetBatchResponse(
             id=batch.id,
@@ -107,59 +138,88 @@ class BatchService:
         )
 
     # ---------------- GET ALL BATCHES (CACHED) ----------------
-    # ---------------- GET ALL BATCHES (CACHED) ----------------
-    async def get_all_batches(self) -> list[GetBatchResponse]:
-        cache_key = "cache:batches:all"
-
-        # ✅ await Redis GET
-        cached = await redis_client.get(cache_key)
-        if cached:
-            data = json.loads(cached)
-            return [GetBatchResponse(**item) for item in data]
+    async def get_all_batches(
+        self, cursor: Optional[str], page_size: int
+    ) -> Union[Response, GetApiResponse[List[GetBatchResponse]]]:
+        if cursor is None and page_size == DEFAULT_LIST_PAGE_SIZE:
+            return await self.get_first_batches_page()
+        return await self.get_batches_page(cursor, page_size)
+
+    # only the default first page is cached, as the finished response body
+    @cached(
+        "batches",
+        "cache:response:batches",
+        ttl=settings.CACHE_EXPIRY_BATCH,
+        serializer=ResponseSerializer(),
+        tags=["batch:*"],
+    )
+    async def get_first_batches_page(self) -> GetApiResponse[List[GetBatchResponse]]:
+        return await self.get_batches_page(None, DEFAULT_LIST_PAGE_SIZE)
+
+    async def get_batches_page(
+        self, cursor: Optional[str], page_size: int
+    ) -> GetApiResponse[List[GetBatchResponse]]:
+        response = await self.load_batches(cursor, page_size)
+        data, next_cursor = split_keyset_page(
+            response, page_size, Batch.id, Batch.id, OrderByTypes.ASC
+        )
+        return GetApiResponse(
+            page_size=page_size,
+            next_cursor=next_cursor,
+            has_more=next_cursor is not None,
+            data=data,
+        )
 
-        # DB call (sync)
-        batches = get_all_batches(self.db)
+    async def load_batches(
+        self, cursor: Optional[str], page_size: int
+    ) -> list[GetBatchResponse]:
+        query = apply_keyset_pagination(
+            select(Batch), Batch.id, Batch.id, OrderByTypes.ASC, cursor, page_size
+        )
+        batches = (await self.db.scalars(query)).all()
+        users = await user_name_resolver.get_many(
+            self.db,
+            (uid for batch in batches for uid in (batch.created_by, batch.updated_by)),
+        )
 
-        response = [self.get_batch_response(batch) for batch in batches]
+        syllabus_map = await self.get_syllabus_map(batches)
 
-        # ✅ await Redis SETEX
-        await redis_client.setex(
-            cache_key, 120, json.dumps([r.dict() for r in response], default=str)
-        )
+        response = [
+            self.get_batch_response(batch, users, syllabus_map) for batch in batches
+        ]
 
         return response
 
     # ---------------- GET BATCH BY ID (CACHED) ----------------
+    @cached(
+        "batches",
+        "cache:batches:{batch_id}",
+        ttl=settings.CACHE_EXPIRY_BATCH,
+        serializer=ModelSerializer(GetBatchResponse),
+        tags=["batch:{batch_id}"],
+    )
     async def get_batch_by_id(self, batch_id: int) -> GetBatchResponse:
-        cache_key = f"cache:batches:{batch_id}"
-
-        # ✅ await Redis GET
-        cached = await redis_client.get(cache_key)
-
-        if cached:
-            return GetBatchResponse(**json.loads(cached))
-
-        # DB call (sync)
-        batch = get_batch(self.db, batch_id)
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
 
-        response = self.get_batch_response(batch)
-
-        # ✅ await Redis SETEX
-        await redis_client.setex(
-            cache_key, 120, json.dumps(response.dict(), default=str)
+        users = await user_name_resolver.get_many(
+            self.db, [batch.created_by, batch.updated_by]
         )
+        syllabus_map = await self.get_syllabus_map([batch])
+        response = self.get_batch_response(batch, users, syllabus_map)
 
         return response
 
     # ---------------- UPDATE BATCH ----------------
-    def update_batch_by_id(
+    async def update_batch_by_id(
         self, batch_id: int, request: BatchRequest, logged_in_user_id: int
     ) -> CreateResponse:
-        batch = get_batch(self.db, batch_id)
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
 
-        existing_syllabus_ids = count_syllabus_by_ids(self.db, request.syllabus_ids)
+        existing_syllabus_ids = await count_syllabus_by_ids(
+            self.db, request.syllabus_ids
+        )
         if existing_syllabus_ids != len(request.syllabus_ids):
             validate_data_not_found(False, ONE_OR_MORE_SYLLABUS_NOT_FOUND)
 
@@ -172,43 +232,49 @@ class BatchService:
         batch.updated_by = logged_in_user_id
         batch.is_active = request.is_active
 
-        self.db.commit()
+        await self.db.commit()
 
         #  cache invalidation
-        redis_client.delete("cache:batches:all")
-        redis_client.delete(f"cache:batches:{batch_id}")
+        await invalidate_tags("batch:*", f"batch:{batch_id}")
 
         return CreateResponse(id=batch.id, message=BATCH_UPDATED_SUCCESSFULLY)
 
     # ---------------- DELETE BATCH ----------------
-    def delete_batch_by_id(self, batch_id: int) -> CreateResponse:
-        batch = get_batch(self.db, batch_id)
+    async def delete_batch_by_id(self, batch_id: int) -> CreateResponse:
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
         # 1. Delete linked class schedules
-        self.db.query(ClassSchedule).filter(ClassSchedule.batch_id == batch_id).delete()
-        
+        await self.db.execute(
+            delete(ClassSchedule).where(ClassSchedule.batch_id == batch_id)
+        )
+
         # 2. Delete linked batch-student associations
-        self.db.query(BatchStudent).filter(BatchStudent.batch_id == batch_id).delete()
+        await self.db.execute(
+            delete(BatchStudent).where(BatchStudent.batch_id == batch_id)
+        )
 
         # 3. Delete the batch itself
-        self.db.delete(batch)
-        self.db.commit()
+        await self.db.delete(batch)
+        await self.db.commit()
 
         #  cache invalidation
-        redis_client.delete("cache:batches:all")
-        redis_client.delete(f"cache:batches:{batch_id}")
-        redis_client.delete(f"cache:batch:schedule:{batch_id}")
+        await invalidate_tags(
+            "batch:*",
+            f"batch:{batch_id}",
+            f"batch:{batch_id}:schedules",
+            f"batch:{batch_id}:students",
+        )
 
         return CreateResponse(id=batch.id, message=BATCH_DELETED_SUCCESSFULLY)
 
     # ---------------- CREATE CLASS SCHEDULE ----------------
-    def create_schedule(
+    async def create_schedule(
         self, batch_id: int, request: ClassScheduleRequest, user_id: int
     ) -> CreateResponse:
-        batch = get_batch(self.db, batch_id)
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
 
-        existing_class = get_class_schedule_by_batch_and_time(
+        existing_class = await get_class_schedule_by_batch_and_time(
             self.db, batch_id, request.day, request.start_time
         )
         validate_data_exits(
@@ -226,10 +292,10 @@ class BatchService:
         )
 
         self.db.add(schedule)
-        self.db.commit()
+        await self.db.commit()
 
         #  cache invalidation
-        redis_client.delete(f"cache:batch:schedule:{batch_id}")
+        await invalidate_tags(f"batch:{batch_id}:schedules")
 
         return CreateResponse(
             id=schedule.id, message=CLASS_SCHEDULE_CREATED_SUCCESSFULLY
@@ -237,10 +303,8 @@ class BatchService:
 
     # ---------------- HELPER ----------------
     def get_class_schedule_reponse(
-        self, class_schedule: ClassSchedule
+        self, class_schedule: ClassSchedule, user_dict: Dict[int, str]
     ) -> GetClassScheduleResponse:
-        user_dict = get_all_users_dict(self.db)
-
         return GetClassScheduleResponse(
             id=class_schedule.id,
             day=class_schedule.day,
@@ -255,28 +319,31 @@ class BatchService:
         )
 
     # ---------------- GET SCHEDULES BY BATCH (CACHED) ----------------
+    @cached(
+        "class_schedules",
+        "cache:class_schedules:{batch_id}",
+        ttl=settings.CACHE_EXPIRY_BATCH,
+        serializer=ModelListSerializer(GetClassScheduleResponse),
+        tags=["batch:{batch_id}:schedules"],
+    )
     async def get_schedules_by_batch(
         self, batch_id: int
     ) -> list[GetClassScheduleResponse]:
-
-        cache_key = f"cache:class_schedules:{batch_id}"
-
-        # ✅ await Redis GET
-        cached = await redis_client.get(cache_key)
-        if cached:
-            data = json.loads(cached)
-            return [GetClassScheduleResponse(**item) for item in data]
-
-        # DB call (sync)
-        schedules = get_batch_class_schedules(self.db, batch_id)
-
-        response = [self.get_class_schedule_reponse(schedule) for schedule in schedules]
-
-        # ✅ await Redis SETEX
-        await redis_client.setex(
-            cache_key, 120, json.dumps([r.dict() for r in response], default=str)
+        schedules = await get_batch_class_schedules(self.db, batch_id)
+        user_dict = await user_name_resolver.get_many(
+            self.db,
+            (
+                uid
+                for schedule in schedules
+                for uid in (schedule.created_by, schedule.updated_by)
+            ),
         )
 
+        response = [
+            self.get_class_schedule_reponse(schedule, user_dict)
+            for schedule in schedules
+        ]
+
         return response
 
     # ---------------- UPDATE SCHEDULE ----------------
@@ -288,10 +355,10 @@ class BatchService:
         user_id: int,
     ) -> SuccessMessageResponse:
 
-        batch = get_batch(self.db, batch_id)
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
 
-        schedule = get_class_schedule_by_id(self.db, schedule_id, batch_id)
+        schedule = await get_class_schedule_by_id(self.db, schedule_id, batch_id)
         validate_data_not_found(schedule, CLASS_SCHEDULE_NOT_FOUND)
 
         schedule.day = request.day
@@ -300,49 +367,51 @@ class BatchService:
         schedule.topic = request.topic
         schedule.updated_by = user_id
 
-        self.db.commit()
+        await self.db.commit()
 
         # ✅ await async redis
-        await redis_client.delete(f"cache:batch:schedule:{batch_id}")
+        await invalidate_tags(f"batch:{batch_id}:schedules")
 
         return SuccessMessageResponse(message=CLASS_SCHEDULE_UPDATED_SUCCESSFULLY)
 
     # ---------------- DELETE SCHEDULE ----------------
-    def delete_schedule_by_id(
+    async def delete_schedule_by_id(
         self, schedule_id: int, batch_id: int
     ) -> SuccessMessageResponse:
-        batch = get_batch(self.db, batch_id)
+        batch = await get_batch(self.db, batch_id)
         validate_data_not_found(batch, BATCH_NOT_FOUND)
 
-        schedule = get_class_schedule_by_id(self.db, schedule_id, batch_id)
+        schedule = await get_class_schedule_by_id(self.db, schedule_id, batch_id)
         validate_data_not_found(schedule, CLASS_SCHEDULE_NOT_FOUND)
 
-        self.db.delete(schedule)
-        self.db.commit()
+        await self.db.delete(schedule)
+        await self.db.commit()
 
         #  cache invalidation
-        redis_client.delete(f"cache:batch:schedule:{batch_id}")
+        await invalidate_tags(f"batch:{batch_id}:schedules")
 
         return SuccessMessageResponse(message=CLASS_SCHEDULE_DELETED_SUCCESSFULLY)
 
     # ---------------- GET CHAT HISTORY ----------------
-    def get_chat_history(self, batch_id: int, user: User) -> list[GetChatMessageResponse]:
+    async def get_chat_history(
+        self, batch_id: int, user: User, cursor: Optional[str], page_size: int
+    ) -> Tuple[list[GetChatMessageResponse], Optional[str]]:
         # Check Authorization
         is_authorized = False
         if user.role in ["Admin", "SuperAdmin"]:
             is_authorized = True
         elif user.role == "Mentor":
-            batch = self.db.query(Batch).filter(Batch.id == batch_id, Batch.mentor == user.id).first()
+            batch = await self.db.scalar(
+                select(Batch)
+                .where(Batch.id == batch_id, Batch.mentor == user.id)
+                .limit(1)
+            )
             if batch:
                 is_authorized = True
         elif user.role == "Student":
-            student = self.db.query(Student).filter(Student.user_id == user.id).first()
+            student = await get_student_by_id(self.db, user.id)
             if student:
-                enrollment = (
-                    self.db.query(BatchStudent)
-                    .filter(BatchStudent.batch_id == batch_id, BatchStudent.student_id == student.id)
-                    .first()
-                )
+                enrollment = await get_student_in_batch(self.db, student.id, batch_id)
                 if enrollment:
                     is_authorized = True
         
@@ -352,16 +421,30 @@ class BatchService:
                 detail="You are not authorized to view this chat."
             )
 
-        results = (
-            self.db.query(ChatMessage, User)
+        query = apply_keyset_pagination(
+            select(ChatMessage, User)
             .join(User, ChatMessage.user_id == User.id)
-            .filter(ChatMessage.batch_id == batch_id)
-            .order_by(ChatMessage.timestamp)
-            .all()
+            .where(ChatMessage.batch_id == batch_id),
+            ChatMessage.timestamp,
+            ChatMessage.id,
+            OrderByTypes.DESC,
+            cursor,
+            page_size,
+            params=[batch_id],
+        )
+        # pages walk back from the latest message; the cursor points to older ones
+        results, next_cursor = split_keyset_page(
+            (await self.db.execute(query)).all(),
+            page_size,
+            ChatMessage.timestamp,
+            ChatMessage.id,
+            OrderByTypes.DESC,
+            get_entity=itemgetter(0),
+            params=[batch_id],
         )
 
         response = []
-        for msg, user in results:
+        for msg, user in reversed(results):
             response.append(
                 GetChatMessageResponse(
                     id=msg.id,
@@ -374,5 +457,4 @@ class BatchService:
                 )
             )
 
-        return response
-
+        return response, next_cursor
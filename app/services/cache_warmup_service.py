@@ -0,0 +1,40 @@
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.connectors.database_connector import get_async_database
+from app.services.batch_service import BatchService
+from app.services.student_service import StudentService
+from app.services.syllabus_service import SyllabusService
+from app.utils.cache import cache_warmer
+
+
+def _with_session(load: Callable[[AsyncSession], Awaitable]):
+    async def warm():
+        async with get_async_database() as db:
+            await load(db)
+
+    return warm
+
+
+# the first page of each list the dashboards open with
+cache_warmer.register(
+    "cache:response:batches",
+    _with_session(lambda db: BatchService(db).get_first_batches_page()),
+)
+cache_warmer.register(
+    "cache:response:syllabus",
+    _with_session(lambda db: SyllabusService(db).get_all_syllabus()),
+)
+cache_warmer.register(
+    "cache:response:students",
+    _with_session(lambda db: StudentService(db).get_first_students_page()),
+)
+
+
+async def warm_up_cache() -> None:
+    if settings.CACHE_WARMUP_DEADLINE > 0:
+        await cache_warmer.warm_all(
+            settings.CACHE_WARMUP_CONCURRENCY, settings.CACHE_WARMUP_DEADLINE
+        )
@@ -1,5 +1,7 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.entities.user import User
 from app.entities.batch import Batch
 from app.utils.enums import Roles
@@ -7,38 +9,56 @@ from app.models.dashboard_models import DashboardStatsResponse, RoleDistribution
 
 
 class DashboardService:
-    def __init__(self, db: Session):
+    # cache tags whose invalidation changes the stats
+    DEPENDS_ON = ("user:*", "batch:*")
+
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_stats(self) -> DashboardStatsResponse:
+    @staticmethod
+    def current_year() -> int:
+        # the enrollment trend covers this year; no tag changes when it ends
+        return datetime.now().year
+
+    async def get_stats(self, year: int) -> DashboardStatsResponse:
         # 1. User Counts
         total_users = (
-            self.db.query(func.count(User.id)).filter(User.is_active == True).scalar()
+            await self.db.scalar(
+                select(func.count(User.id)).where(User.is_active == True)
+            )
             or 0
         )
         total_students = (
-            self.db.query(func.count(User.id))
-            .filter(User._User__role == Roles.Student.value, User.is_active == True)
-            .scalar()
+            await self.db.scalar(
+                select(func.count(User.id)).where(
+                    User._User__role == Roles.Student.value, User.is_active == True
+                )
+            )
             or 0
         )
         total_mentors = (
-            self.db.query(func.count(User.id))
-            .filter(User._User__role == Roles.Mentor.value, User.is_active == True)
-            .scalar()
+            await self.db.scalar(
+                select(func.count(User.id)).where(
+                    User._User__role == Roles.Mentor.value, User.is_active == True
+                )
+            )
             or 0
         )
         total_admins = (
-            self.db.query(func.count(User.id))
-            .filter(User._User__role == Roles.Admin.value, User.is_active == True)
-            .scalar()
+            await self.db.scalar(
+                select(func.count(User.id)).where(
+                    User._User__role == Roles.Admin.value, User.is_active == True
+                )
+            )
             or 0
         )
 
         # 2. Batch Counts
-        total_batches = self.db.query(func.count(Batch.id)).scalar() or 0
+        total_batches = await self.db.scalar(select(func.count(Batch.id))) or 0
         active_batches = (
-            self.db.query(func.count(Batch.id)).filter(Batch.is_active == True).scalar()
+            await self.db.scalar(
+                select(func.count(Batch.id)).where(Batch.is_active == True)
+            )
             or 0
         )
 
@@ -52,26 +72,24 @@ class DashboardService:
         # 4. Student Enrollment Trend (Group by Month)
         from sqlalchemy import extract
         import calendar
-        from datetime import datetime
-
-        current_year = datetime.now().year
         
         # Initialize dictionary with 0 for all months
         monthly_counts = {calendar.month_abbr[i]: 0 for i in range(1, 13)}
 
         enrollment_data = (
-            self.db.query(
-                func.extract('month', User.created_at).label('month'),
-                func.count(User.id).label('count')
+            await self.db.execute(
+                select(
+                    func.extract('month', User.created_at).label('month'),
+                    func.count(User.id).label('count')
+                )
+                .where(
+                    User._User__role == Roles.Student.value,
+                    User.is_active == True,
+                    func.extract('year', User.created_at) == year
+                )
+                .group_by(func.extract('month', User.created_at))
             )
-            .filter(
-                User._User__role == Roles.Student.value,
-                User.is_active == True,
-                func.extract('year', User.created_at) == current_year
-            )
-            .group_by(func.extract('month', User.created_at))
-            .all()
-        )
+        ).all()
 
         for month_num, count in enrollment_data:
             month_name = calendar.month_abbr[int(month_num)]
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Tuple
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.connectors.database_connector import get_db
+from app.connectors.database_connector import get_async_db
 from app.entities.guest import Guest
 from app.models.base_response_model import SuccessMessageResponse
 from app.models.guest_models import GuestRequest, GetGuestResponse
@@ -13,15 +14,17 @@ from app.utils.constants import (
     GUEST_DELETED_SUCCESSFULLY,
     GUEST_NOT_FOUND,
 )
+from app.utils.enums import OrderByTypes
+from app.utils.helpers import apply_keyset_pagination, split_keyset_page
 from app.utils.validation import validate_data_not_found
 
 
 @dataclass
 class GuestService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
     # ---------------- CREATE ----------------
-    def create_guest(self, request: GuestRequest) -> SuccessMessageResponse:
+    async def create_guest(self, request: GuestRequest) -> SuccessMessageResponse:
 
         guest = Guest(
             name=request.name,
@@ -31,13 +34,24 @@ class GuestService:
         )
 
         self.db.add(guest)
-        self.db.commit()
+        await self.db.commit()
 
         return SuccessMessageResponse(message=GUEST_CREATED_SUCCESSFULLY)
 
     # ---------------- GET ALL ----------------
-    def get_all_guests(self) -> List[GetGuestResponse]:
-        guests = self.db.query(Guest).all()
+    async def get_all_guests(
+        self, cursor: Optional[str], page_size: int
+    ) -> Tuple[List[GetGuestResponse], Optional[str]]:
+        query = apply_keyset_pagination(
+            select(Guest), Guest.id, Guest.id, OrderByTypes.ASC, cursor, page_size
+        )
+        guests, next_cursor = split_keyset_page(
+            (await self.db.scalars(query)).all(),
+            page_size,
+            Guest.id,
+            Guest.id,
+            OrderByTypes.ASC,
+        )
 
         return [
             GetGuestResponse(
@@ -49,11 +63,11 @@ class GuestService:
                 created_at=g.created_at,
             )
             for g in guests
-        ]
+        ], next_cursor
 
     # ---------------- GET BY ID ----------------
-    def get_guest_by_id(self, guest_id: int) -> GetGuestResponse:
-        guest = self.db.query(Guest).filter(Guest.id == guest_id).first()
+    async def get_guest_by_id(self, guest_id: int) -> GetGuestResponse:
+        guest = await self.db.scalar(select(Guest).where(Guest.id == guest_id).limit(1))
         validate_data_not_found(guest, GUEST_NOT_FOUND)
 
         return GetGuestResponse(
@@ -66,11 +80,11 @@ class GuestService:
         )
 
     # ---------------- DELETE ----------------
-    def delete_guest(self, guest_id: int) -> SuccessMessageResponse:
-        guest = self.db.query(Guest).filter(Guest.id == guest_id).first()
+    async def delete_guest(self, guest_id: int) -> SuccessMessageResponse:
+        guest = await self.db.scalar(select(Guest).where(Guest.id == guest_id).limit(1))
         validate_data_not_found(guest, GUEST_NOT_FOUND)
 
-        self.db.delete(guest)
-        self.db.commit()
+        await self.db.delete(guest)
+        await self.db.commit()
 
         return SuccessMessageResponse(message=GUEST_DELETED_SUCCESSFULLY)
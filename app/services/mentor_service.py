@@ -1,12 +1,10 @@
 from dataclasses import dataclass
-from typing import Dict
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.connectors.database_connector import get_db
+from app.connectors.database_connector import get_async_db
 from app.entities.mentor import MentorProfile
-from app.entities.user import User
 from app.models.base_response_model import SuccessMessageResponse
 from app.models.mentor_models import (
     MentorProfileRequest,
@@ -18,31 +16,26 @@ from app.utils.constants import (
     MENTOR_PROFILE_NOT_FOUND,
     USER_NOT_MENTOR,
 )
-from app.utils.db_queries import get_user_by_id
-from app.utils.helpers import get_all_users_dict
+from app.utils.db_queries import get_mentor_profile_by_user_id, get_user_by_id
 from app.utils.validation import validate_data_exits, validate_data_not_found
 
 
 @dataclass
 class MentorService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
     # ---------------- CREATE ----------------
-    def create_mentor_profile(
+    async def create_mentor_profile(
         self, request: MentorProfileRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
 
-        mentor_user = get_user_by_id(self.db, request.user_id)
+        mentor_user = await get_user_by_id(self.db, request.user_id)
         validate_data_not_found(mentor_user, USER_NOT_MENTOR)
 
         if mentor_user.role != "Mentor":
             validate_data_not_found(None, USER_NOT_MENTOR)
 
-        existing = (
-            self.db.query(MentorProfile)
-            .filter(MentorProfile.user_id == request.user_id)
-            .first()
-        )
+        existing = await get_mentor_profile_by_user_id(self.db, request.user_id)
         validate_data_exits(existing, MENTOR_PROFILE_ALREADY_EXISTS)
 
         mentor_profile = MentorProfile(
@@ -53,20 +46,18 @@ class MentorService:
         )
 
         self.db.add(mentor_profile)
-        self.db.commit()
-        self.db.refresh(mentor_profile)
+        await self.db.commit()
+        await self.db.refresh(mentor_profile)
 
         return SuccessMessageResponse(message=MENTOR_PROFILE_CREATED_SUCCESSFULLY)
 
     # ---------------- GET BY USER ID ----------------
-    def get_mentor_profile_by_user_id(self, user_id: int) -> GetMentorProfileResponse:
-        mentor_profile = (
-            self.db.query(MentorProfile)
-            .filter(MentorProfile.user_id == user_id)
-            .first()
-        )
-        
-        mentor_user = self.db.query(User).filter(User.id == user_id).first()
+    async def get_mentor_profile_by_user_id(
+        self, user_id: int
+    ) -> GetMentorProfileResponse:
+        mentor_profile = await get_mentor_profile_by_user_id(self.db, user_id)
+
+        mentor_user = await get_user_by_id(self.db, user_id)
         validate_data_not_found(mentor_user, "User not found")
 
         if not mentor_profile:
@@ -81,9 +72,6 @@ class MentorService:
                 created_at=mentor_user.created_at,
             )
 
-        users_dict: Dict[int, str] = get_all_users_dict(self.db)
-        mentor_user = self.db.query(User).filter(User.id == user_id).first()
-
         return GetMentorProfileResponse(
             id=mentor_profile.id,
             name=mentor_user.name,
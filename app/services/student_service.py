@@ -1,16 +1,21 @@
 from dataclasses import dataclass
-from typing import Dict, List
-import json
+from typing import Dict, List, Optional, Union
 
 from fastapi import Depends
-from sqlalchemy import func
-from sqlalchemy.orm import aliased, Session
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.connectors.database_connector import get_db
+from app.connectors.database_connector import get_async_db
 from app.entities.student import Student
 from app.entities.batch_student import BatchStudent
 from app.entities.user import User
-from app.models.base_response_model import SuccessMessageResponse
+from app.models.base_response_model import (
+    ApiResponse,
+    GetApiResponse,
+    SuccessMessageResponse,
+)
 from app.models.student_models import (
     GetMappedBatchStudentResponse,
     GetStudentResponse,
@@ -19,6 +24,7 @@ from app.models.student_models import (
     UpdatedBatchStudentRequest,
 )
 from app.utils.constants import (
+    DEFAULT_LIST_PAGE_SIZE,
     MAPPING_NOT_FOUND,
     STUDENT_ALREADY_EXISTS_IN_THE_BATCH,
     STUDENT_BATCH_DETAILS_CREATED_SUCCESSFULLY,
@@ -38,21 +44,29 @@ from app.utils.db_queries import (
     get_students,
     get_user_by_id,
 )
-from app.utils.helpers import get_all_users_dict
+from app.utils.enums import OrderByTypes
+from app.utils.helpers import apply_keyset_pagination, split_keyset_page
 from app.utils.validation import validate_data_exits, validate_data_not_found
-from app.utils.redis_client import redis_client
+from app.utils.cache import (
+    ModelSerializer,
+    ResponseSerializer,
+    add_cache_tags,
+    cached,
+    invalidate_tags,
+)
+from app.utils.user_name_cache import user_name_resolver
 from app.config import settings
 
 
 @dataclass
 class StudentService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
     # ---------------- CREATE ----------------
-    def create_student(
+    async def create_student(
         self, request: StudentRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
-        student_details = get_student_by_id(self.db, request.user_id)
+        student_details = await get_student_by_id(self.db, request.user_id)
         validate_data_exits(student_details, STUDENT_DETAILS_ALREADY_EXISTS)
 
         new_student = Student(
@@ -67,10 +81,10 @@ class StudentService:
             updated_by=logged_in_user_id,
         )
         self.db.add(new_student)
-        self.db.commit()
+        await self.db.commit()
 
         # 🔥 cache invalidation
-        redis_client.delete("cache:students:all")
+        await invalidate_tags("student:*")
 
         return SuccessMessageResponse(message=STUDENT_CREATED_SUCCESSFULLY)
 
@@ -79,23 +93,65 @@ class StudentService:
 
     # ---------------- GET ALL STUDENTS (CACHED) ----------------
 
-    async def get_all_students(self) -> List[GetStudentResponse]:
-        cache_key = "cache:students:all"
-
-        cached = await redis_client.get(cache_key)  # ✅ await
-
-        if cached:
-            data = json.loads(cached)
-            return [GetStudentResponse(**item) for item in data]
+    async def get_all_students(
+        self, cursor: Optional[str], page_size: int
+    ) -> Union[Response, GetApiResponse[List[GetStudentResponse]]]:
+        if cursor is None and page_size == DEFAULT_LIST_PAGE_SIZE:
+            return await self.get_first_students_page()
+        return await self.get_students_page(cursor, page_size)
+
+    # only the default first page is cached, as the finished response body
+    @cached(
+        "students",
+        "cache:response:students",
+        ttl=settings.CACHE_EXPIRY_STUDENT,
+        serializer=ResponseSerializer(),
+        tags=["student:*"],
+    )
+    async def get_first_students_page(
+        self,
+    ) -> GetApiResponse[List[GetStudentResponse]]:
+        return await self.get_students_page(None, DEFAULT_LIST_PAGE_SIZE)
+
+    async def get_students_page(
+        self, cursor: Optional[str], page_size: int
+    ) -> GetApiResponse[List[GetStudentResponse]]:
+        response = await self.load_students(cursor, page_size)
+        data, next_cursor = split_keyset_page(
+            response, page_size, Student.id, Student.id, OrderByTypes.ASC
+        )
+        return GetApiResponse(
+            page_size=page_size,
+            next_cursor=next_cursor,
+            has_more=next_cursor is not None,
+            data=data,
+        )
 
+    async def load_students(
+        self, cursor: Optional[str], page_size: int
+    ) -> List[GetStudentResponse]:
         StudentUser = aliased(User)
-        results = (
-            self.db.query(Student, StudentUser)
-            .join(StudentUser, Student.user_id == StudentUser.id)
-            .all()
+        query = apply_keyset_pagination(
+            select(Student, StudentUser).join(
+                StudentUser, Student.user_id == StudentUser.id
+            ),
+            Student.id,
+            Student.id,
+            OrderByTypes.ASC,
+            cursor,
+            page_size,
+        )
+        results = (await self.db.execute(query)).all()
+        add_cache_tags(*(f"user:{user.id}" for _, user in results))
+
+        users = await user_name_resolver.get_many(
+            self.db,
+            (
+                uid
+                for student, _ in results
+                for uid in (student.referral_by, student.created_by, student.updated_by)
+            ),
         )
-        
-        users = get_all_users_dict(self.db)
 
         response = []
         for student, user in results:
@@ -119,25 +175,25 @@ class StudentService:
                 )
             )
 
-        await redis_client.setex(  # ✅ await
-            cache_key, settings.CACHE_EXPIRY_STUDENT, json.dumps([r.dict() for r in response], default=str)
-        )
-
         return response
 
     # ---------------- GET STUDENT BY ID (CACHED) ----------------
+    @cached(
+        "students",
+        "cache:students:{student_id}",
+        ttl=settings.CACHE_EXPIRY_STUDENT,
+        serializer=ModelSerializer(GetStudentResponse),
+        tags=["student:{student_id}"],
+    )
     async def get_student_by_id(self, student_id: int) -> GetStudentResponse:
-        cache_key = f"cache:students:{student_id}"
-        cached = await redis_client.get(cache_key)
-
-        if cached:
-            return GetStudentResponse(**json.loads(cached))
-
-        student = get_student(self.db, student_id)
+        student = await get_student(self.db, student_id)
         validate_data_not_found(student, STUDENT_NOT_FOUND)
 
-        user = get_user_by_id(self.db, student.user_id)
-        users = get_all_users_dict(self.db)
+        user = await get_user_by_id(self.db, student.user_id)
+        add_cache_tags(f"user:{student.user_id}")
+        users = await user_name_resolver.get_many(
+            self.db, [student.referral_by, student.created_by, student.updated_by]
+        )
 
         response = GetStudentResponse(
             id=student.id,
@@ -156,10 +212,6 @@ class StudentService:
             updated_by=users.get(student.updated_by),
             is_active=student.is_active,
         )
-
-        await redis_client.setex(
-            cache_key, settings.CACHE_EXPIRY_STUDENT, json.dumps(response.dict(), default=str)
-        )
         return response
 
     # ---------------- UPDATE ----------------
@@ -167,7 +219,7 @@ class StudentService:
         self, student_id: int, request: StudentRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
 
-        student = get_student(self.db, student_id)
+        student = await get_student(self.db, student_id)
         validate_data_not_found(student, STUDENT_NOT_FOUND)
 
         for key, value in request.dict().items():
@@ -175,23 +227,21 @@ class StudentService:
 
         student.updated_at = func.now()
         student.updated_by = logged_in_user_id
-        self.db.commit()
+        await self.db.commit()
 
-        await redis_client.delete("cache:students:all")
-        await redis_client.delete(f"cache:students:{student_id}")
+        await invalidate_tags("student:*", f"student:{student_id}")
 
         return SuccessMessageResponse(message=STUDENT_UPDATED_SUCCESSFULLY)
 
     # ---------------- DELETE ----------------
     async def delete_student_by_id(self, student_id: int) -> SuccessMessageResponse:
-        student = get_student(self.db, student_id)
+        student = await get_student(self.db, student_id)
         validate_data_not_found(student, STUDENT_NOT_FOUND)
 
-        self.db.delete(student)
-        self.db.commit()
+        await self.db.delete(student)
+        await self.db.commit()
 
-        await redis_client.delete("cache:students:all")
-        await redis_client.delete(f"cache:students:{student_id}")
+        await invalidate_tags("student:*", f"student:{student_id}")
 
         return SuccessMessageResponse(message=STUDENT_DELETED_SUCCESSFULLY)
 
@@ -200,10 +250,10 @@ class StudentService:
         self, student_id: int, request: MapStudentToBatchRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
 
-        student = get_student(self.db, student_id)
+        student = await get_student(self.db, student_id)
         validate_data_not_found(student, STUDENT_NOT_FOUND)
 
-        existing = get_student_in_batch(self.db, student_id, request.batch_id)
+        existing = await get_student_in_batch(self.db, student_id, request.batch_id)
         validate_data_exits(existing, STUDENT_ALREADY_EXISTS_IN_THE_BATCH)
 
         student_batch = BatchStudent(
@@ -221,9 +271,9 @@ class StudentService:
         )
 
         self.db.add(student_batch)
-        self.db.commit()
+        await self.db.commit()
 
-        await redis_client.delete(f"cache:batch:{request.batch_id}")
+        await invalidate_tags(f"batch:{request.batch_id}:students")
 
         return SuccessMessageResponse(
             message=STUDENT_BATCH_DETAILS_CREATED_SUCCESSFULLY
@@ -256,64 +306,85 @@ class StudentService:
         )
 
     # ---------------- GET BATCH STUDENTS (CACHED) ----------------
+    @cached(
+        "batch_students",
+        "cache:response:batch_students:{batch_id}",
+        ttl=settings.CACHE_EXPIRY_BATCH,
+        serializer=ResponseSerializer(),
+        tags=["batch:{batch_id}:students"],
+    )
     async def get_batch_students(
         self, batch_id: int
-    ) -> List[GetMappedBatchStudentResponse]:
-        cache_key = f"cache:batch:{batch_id}"
-        cached = await redis_client.get(cache_key)
-
-        if cached:
-            return [
-                GetMappedBatchStudentResponse(**item)
-                for item in json.loads(cached)
-            ]
-
+    ) -> ApiResponse[List[GetMappedBatchStudentResponse]]:
         StudentUser = aliased(User)
         results = (
-            self.db.query(Student, StudentUser, BatchStudent)
-            .join(BatchStudent, Student.id == BatchStudent.student_id)
-            .join(StudentUser, Student.user_id == StudentUser.id)
-            .filter(BatchStudent.batch_id == batch_id)
-            .all()
+            await self.db.execute(
+                select(Student, StudentUser, BatchStudent)
+                .join(BatchStudent, Student.id == BatchStudent.student_id)
+                .join(StudentUser, Student.user_id == StudentUser.id)
+                .where(BatchStudent.batch_id == batch_id)
+            )
+        ).all()
+        add_cache_tags(
+            *(
+                tag
+                for student, student_user, _ in results
+                for tag in (f"student:{student.id}", f"user:{student_user.id}")
+            )
         )
 
-        users_dict = get_all_users_dict(self.db)
+        users_dict = await user_name_resolver.get_many(
+            self.db,
+            (
+                uid
+                for _, _, student_batch in results
+                for uid in (
+                    student_batch.referral_by,
+                    student_batch.created_by,
+                    student_batch.updated_by,
+                )
+            ),
+        )
 
         response = [
             self.get_batch_student_response(student_user, student_batch, users_dict)
             for _, student_user, student_batch in results
         ]
-
-        await redis_client.setex(
-            cache_key, settings.CACHE_EXPIRY_BATCH, json.dumps([r.dict() for r in response], default=str)
-        )
-        return response
+        return ApiResponse(data=response)
 
     # ---------------- GET BATCH STUDENT BY ID (CACHED) ----------------
+    @cached(
+        "batch_students",
+        "cache:batch_student:{mapping_id}",
+        ttl=settings.CACHE_EXPIRY_BATCH,
+        serializer=ModelSerializer(GetMappedBatchStudentResponse),
+        tags=["batch_student:{mapping_id}"],
+    )
     async def get_batch_student_by_id(
         self, mapping_id: int
     ) -> GetMappedBatchStudentResponse:
-
-        cache_key = f"cache:batch_student:{mapping_id}"
-        cached = await redis_client.get(cache_key)
-
-        if cached:
-            return GetMappedBatchStudentResponse(**json.loads(cached))
-
-        student_batch = get_mapped_batch_student(self.db, mapping_id)
+        student_batch = await get_mapped_batch_student(self.db, mapping_id)
         validate_data_not_found(student_batch, MAPPING_NOT_FOUND)
 
-        student = get_student(self.db, student_batch.student_id)
-        student_user = get_user_by_id(self.db, student.user_id)
-        users_dict = get_all_users_dict(self.db)
+        student = await get_student(self.db, student_batch.student_id)
+        student_user = await get_user_by_id(self.db, student.user_id)
+        add_cache_tags(
+            f"batch:{student_batch.batch_id}:students",
+            f"student:{student.id}",
+            f"user:{student.user_id}",
+        )
+        users_dict = await user_name_resolver.get_many(
+            self.db,
+            [
+                student_batch.referral_by,
+                student_batch.created_by,
+                student_batch.updated_by,
+            ],
+        )
 
         response = self.get_batch_student_response(
             student_user, student_batch, users_dict
         )
-
-        await redis_client.setex(
-            cache_key, settings.CACHE_EXPIRY_BATCH, json.dumps(response.dict(), default=str)
-        )
         return response
 
     # ---------------- UPDATE BATCH ----------------
@@ -324,17 +395,18 @@ class StudentService:
         logged_in_user_id: int,
     ) -> SuccessMessageResponse:
 
-        student_batch = get_mapped_batch_student(self.db, mapping_id)
+        student_batch = await get_mapped_batch_student(self.db, mapping_id)
         validate_data_not_found(student_batch, MAPPING_NOT_FOUND)
 
         student_batch.class_amount = request.amount
         student_batch.joined_at = request.joined_at
         student_batch.updated_at = func.now()
         student_batch.updated_by = logged_in_user_id
-        self.db.commit()
+        await self.db.commit()
 
-        await redis_client.delete(f"cache:batch_student:{mapping_id}")
-        await redis_client.delete(f"cache:batch:{student_batch.batch_id}")
+        await invalidate_tags(
+            f"batch_student:{mapping_id}", f"batch:{student_batch.batch_id}:students"
+        )
 
         return SuccessMessageResponse(
             message=STUDENT_BATCH_DETAILS_UPDATED_SUCCESSFULLY
@@ -345,15 +417,16 @@ class StudentService:
         self, mapping_id: int
     ) -> SuccessMessageResponse:
 
-        student_batch = get_mapped_batch_student(self.db, mapping_id)
+        student_batch = await get_mapped_batch_student(self.db, mapping_id)
         validate_data_not_found(student_batch, MAPPING_NOT_FOUND)
 
         batch_id = student_batch.batch_id
-        self.db.delete(student_batch)
-        self.db.commit()
+        await self.db.delete(student_batch)
+        await self.db.commit()
 
-        await redis_client.delete(f"cache:batch_student:{mapping_id}")
-        await redis_client.delete(f"cache:batch:{batch_id}")
+        await invalidate_tags(
+            f"batch_student:{mapping_id}", f"batch:{batch_id}:students"
+        )
 
         return SuccessMessageResponse(
             message=STUDENT_BATCH_DETAILS_DELETED_SUCCESSFULLY
@@ -1,12 +1,12 @@
 from dataclasses import dataclass
+from typing import Dict, List
 from fastapi import Depends
 from sqlalchemy import func
-from sqlalchemy.orm import Session
-import json
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.connectors.database_connector import get_db
+from app.connectors.database_connector import get_async_db
 from app.entities.syllabus import Syllabus
-from app.models.base_response_model import SuccessMessageResponse
+from app.models.base_response_model import ApiResponse, SuccessMessageResponse
 from app.models.syllabus_models import GetSyllabusResponse, SyllabusRequest
 from app.utils.constants import (
     SYLLABUS_CREATED_SUCCESSFULLY,
@@ -16,21 +16,26 @@ from app.utils.constants import (
     SYLLABUS_UPDATED_SUCCESSFULLY,
 )
 from app.utils.db_queries import get_all_syllabus, get_syllabus, get_syllabus_by_name
-from app.utils.helpers import get_all_users_dict
 from app.utils.validation import validate_data_exits, validate_data_not_found
-from app.utils.redis_client import redis_client
+from app.utils.cache import (
+    ModelSerializer,
+    ResponseSerializer,
+    cached,
+    invalidate_tags,
+)
+from app.utils.user_name_cache import user_name_resolver
 from app.config import settings
 
 
 @dataclass
 class SyllabusService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
     # ---------------- CREATE ----------------
-    def create_syllabus(
+    async def create_syllabus(
         self, request: SyllabusRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
-        existing_syllabus = get_syllabus_by_name(self.db, request.name)
+        existing_syllabus = await get_syllabus_by_name(self.db, request.name)
         validate_data_exits(existing_syllabus, SYLLABUS_NAME_ALREADY_EXISTS)
 
         syllabus = Syllabus(
@@ -41,10 +46,10 @@ class SyllabusService:
         )
 
         self.db.add(syllabus)
-        self.db.commit()
+        await self.db.commit()
 
         # 🔥 cache invalidation
-        redis_client.delete("cache:syllabus:all")
+        await invalidate_tags("syllabus:*")
 
         return SuccessMessageResponse(
             id=syllabus.id, message=SYLLABUS_CREATED_SUCCESSFULLY
@@ -54,9 +59,8 @@ class SyllabusService:
     def get_syllabus_response(
         self,
         syllabus: Syllabus,
+        users: Dict[int, str],
     ) -> GetSyllabusResponse:
-        users = get_all_users_dict(self.db)
-
         return GetSyllabusResponse(
             id=syllabus.id,
             name=syllabus.name,
@@ -68,79 +72,84 @@ class SyllabusService:
         )
 
     # ---------------- GET ALL SYLLABUS (CACHED) ----------------
-    async def get_all_syllabus(self) -> list[GetSyllabusResponse]:
-        cache_key = "cache:syllabus:all"
-        cached = await redis_client.get(cache_key)
-        if cached:
-            return [GetSyllabusResponse(**item) for item in json.loads(cached)]
-
-        syllabus_list = get_all_syllabus(self.db)
-        response = [self.get_syllabus_response(syllabus) for syllabus in syllabus_list]
-
-        await redis_client.setex(
-            cache_key, settings.CACHE_EXPIRY_SYLLABUS, json.dumps([r.dict() for r in response], default=str)
+    @cached(
+        "syllabus",
+        "cache:response:syllabus",
+        ttl=settings.CACHE_EXPIRY_SYLLABUS,
+        serializer=ResponseSerializer(),
+        tags=["syllabus:*"],
+    )
+    async def get_all_syllabus(self) -> ApiResponse[List[GetSyllabusResponse]]:
+        syllabus_list = await get_all_syllabus(self.db)
+        users = await user_name_resolver.get_many(
+            self.db,
+            (
+                uid
+                for syllabus in syllabus_list
+                for uid in (syllabus.created_by, syllabus.updated_by)
+            ),
         )
-        return response
+        response = [
+            self.get_syllabus_response(syllabus, users) for syllabus in syllabus_list
+        ]
+        return ApiResponse(data=response)
 
     # ---------------- GET SYLLABUS BY ID (CACHED) ----------------
+    @cached(
+        "syllabus",
+        "cache:syllabus:{syllabus_id}",
+        ttl=settings.CACHE_EXPIRY_SYLLABUS,
+        serializer=ModelSerializer(GetSyllabusResponse),
+        tags=["syllabus:{syllabus_id}"],
+    )
     async def get_syllabus_by_id(self, syllabus_id: int) -> GetSyllabusResponse:
-        cache_key = f"cache:syllabus:{syllabus_id}"
-
-        cached = await redis_client.get(cache_key)
-
-        if cached:
-            return GetSyllabusResponse(**json.loads(cached))
-
-        syllabus = get_syllabus(self.db, syllabus_id)
+        syllabus = await get_syllabus(self.db, syllabus_id)
         validate_data_not_found(syllabus, SYLLABUS_NOT_FOUND)
 
-        response = self.get_syllabus_response(syllabus)
-
-        await redis_client.setex(
-            cache_key, settings.CACHE_EXPIRY_SYLLABUS, json.dumps(response.dict(), default=str)
+        users = await user_name_resolver.get_many(
+            self.db, [syllabus.created_by, syllabus.updated_by]
         )
+        response = self.get_syllabus_response(syllabus, users)
 
         return response
 
     # ---------------- VALIDATION ----------------
-    def validate_update_fields(
+    async def validate_update_fields(
         self, syllabus: Syllabus, request: SyllabusRequest
     ) -> None:
         if syllabus.name != request.name:
-            existing_syllabus = get_syllabus_by_name(self.db, request.name)
+            existing_syllabus = await get_syllabus_by_name(self.db, request.name)
             validate_data_exits(existing_syllabus, SYLLABUS_NAME_ALREADY_EXISTS)
 
     # ---------------- UPDATE ----------------
-    def update_syllabus_by_id(
+    async def update_syllabus_by_id(
         self, syllabus_id: int, request: SyllabusRequest, logged_in_user_id: int
     ) -> SuccessMessageResponse:
-        syllabus = get_syllabus(self.db, syllabus_id)
+        syllabus = await get_syllabus(self.db, syllabus_id)
         validate_data_not_found(syllabus, SYLLABUS_NOT_FOUND)
-        self.validate_update_fields(syllabus, request)
+        await self.validate_update_fields(syllabus, request)
 
         syllabus.name = request.name
         syllabus.topics = list(set(request.topics))
         syllabus.updated_at = func.now()
         syllabus.updated_by = logged_in_user_id
 
-        self.db.commit()
+        await self.db.commit()
 
         # 🔥 cache invalidation
-        redis_client.delete("cache:syllabus:all")
-        redis_client.delete(f"cache:syllabus:{syllabus_id}")
+        await invalidate_tags("syllabus:*", f"syllabus:{syllabus_id}")
 
         return SuccessMessageResponse(message=SYLLABUS_UPDATED_SUCCESSFULLY)
 
     # ---------------- DELETE ----------------
-    def delete_syllabus_by_id(self, syllabus_id: int) -> SuccessMessageResponse:
-        syllabus = get_syllabus(self.db, syllabus_id)
+    async def delete_syllabus_by_id(self, syllabus_id: int) -> SuccessMessageResponse:
+        syllabus = await get_syllabus(self.db, syllabus_id)
         validate_data_not_found(syllabus, SYLLABUS_NOT_FOUND)
 
-        self.db.delete(syllabus)
-        self.db.commit()
+        await self.db.delete(syllabus)
+        await self.db.commit()
 
         # 🔥 cache invalidation
-        redis_client.delete("cache:syllabus:all")
-        redis_client.delete(f"cache:syllabus:{syllabus_id}")
+        await invalidate_tags("syllabus:*", f"syllabus:{syllabus_id}")
 
         return SuccessMessageResponse(message=SYLLABUS_DELETED_SUCCESSFULLY)
@@ -1,11 +1,12 @@
-from typing import Dict, List, Tuple
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 
 from dataclasses import dataclass
 from fastapi import Depends, Request, status, HTTPException
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.entities.user import User
-from app.connectors.database_connector import get_db
+from app.connectors.database_connector import get_async_db
 from app.entities.user import User
 from app.models.user_models import (
     UserCreationRequest,
@@ -21,27 +22,31 @@ from app.utils.constants import (
     USER_NOT_FOUND,
 )
 from app.utils.db_queries import (
+    get_estimated_row_count,
     get_user_by_email,
     get_user_by_id,
     get_user_by_phone_number,
 )
+from app.utils.enums import CountModes, OrderByTypes
 from app.utils.helpers import (
     apply_filter,
-    apply_pagination,
+    apply_keyset_pagination,
     apply_sorting,
-    get_all_users_dict,
+    get_offset_value,
+    get_sort_column,
+    split_keyset_page,
 )
+from app.utils.cache import invalidate_tags
+from app.utils.user_name_cache import user_name_resolver
 
 
 @dataclass
 class UserService:
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 
-    def get_active_user_by_email(self, email: str):
-        return (
-            self.db.query(User)
-            .filter(User.email == email, User.is_active == True)
-            .first()
+    async def get_active_user_by_email(self, email: str):
+        return await self.db.scalar(
+            select(User).where(User.email == email, User.is_active == True).limit(1)
         )
 
     def validate_user_details(self, user_details: User):
@@ -50,55 +55,57 @@ class UserService:
                 status_code=status.HTTP_404_NOT_FOUND, detail=USER_NOT_FOUND
             )
 
-    def _validate_email_not_exists(self, email: str) -> None:
-        if get_user_by_email(self.db, email):
+    async def _validate_email_not_exists(self, email: str) -> None:
+        if await get_user_by_email(self.db, email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail=EMAIL_ALREADY_EXISTS
             )
 
-    def _validate_phone_not_exists(self, phone_number: str) -> None:
-        if get_user_by_phone_number(self.db, phone_number):
+    async def _validate_phone_not_exists(self, phone_number: str) -> None:
+        if await get_user_by_phone_number(self.db, phone_number):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=PHONE_NUMBER_ALREADY_EXISTS,
             )
 
-    def create_user(
+    async def create_user(
         self, logged_in_user_id: int, request: UserCreationRequest
     ) -> UserCreationResponse:
-        self._validate_email_not_exists(request.email)
-        self._validate_phone_not_exists(request.phone_number)
+        await self._validate_email_not_exists(request.email)
+        await self._validate_phone_not_exists(request.phone_number)
 
         user = User(
             name=request.name,
             email=request.email,
             gender=request.gender,
-            password=request.password,
             role=request.role.capitalize(),
             phone_number=request.phone_number,
             created_by=logged_in_user_id,
             updated_by=logged_in_user_id,
         )
+        await user.set_password(request.password)
 
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+
+        await invalidate_tags("user:*")
 
         return UserCreationResponse(id=user.id, message=USER_CREATED_SUCCESSFULLY)
 
-    def update_user(
+    async def update_user(
         self, user_id: int, request: UserUpdateRequest, logged_in_user_id: int
     ) -> UserCreationResponse:
-        user = get_user_by_id(self.db, user_id)
+        user = await get_user_by_id(self.db, user_id)
         self.validate_user_details(user)
 
         # Check if email is being changed and if it exists
         if user.email != request.email:
-            self._validate_email_not_exists(request.email)
+            await self._validate_email_not_exists(request.email)
 
         # Check if phone is being changed and if it exists
         if user.phone_number != request.phone_number:
-            self._validate_phone_not_exists(request.phone_number)
+            await self._validate_phone_not_exists(request.phone_number)
 
         user.name = request.name
         user.email = request.email
@@ -108,13 +115,29 @@ class UserService:
         user.is_active = request.is_active
         user.updated_by = logged_in_user_id
 
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+
+        # cached responses embed this user's name and contact details, and
+        # cached names are only served under the current `user:{id}`
+        # generation; bumping it retires both in every worker
+        await invalidate_tags("user:*", f"user:{user.id}")
 
         return UserCreationResponse(id=user.id, message="User updated successfully")
 
     def base_get_user_query(self):
-        return self.db.query(User)
+        return select(User)
+
+    def get_search_rank(self, search: str):
+        """
+        Best pg_trgm similarity of the search term across the searched columns.
+        """
+        term = search.strip()
+        return func.greatest(
+            func.similarity(User.name, term),
+            func.similarity(User.email, term),
+            func.similarity(User.phone_number, term),
+        ).label("search_rank")
 
     def get_matched_user_based_on_search(
         self,
@@ -134,7 +157,24 @@ class UserService:
 
         return query
 
-    def get_all_user_data(
+    async def count_users(
+        self, query, count_mode: CountModes, filtered: bool
+    ) -> Optional[int]:
+        """
+        Total for the listing, as far as the count mode asks for it up front.
+        Window counts are read off the page rows instead.
+        """
+        if count_mode in (CountModes.NONE, CountModes.WINDOW):
+            return None
+        if count_mode == CountModes.ESTIMATED and not filtered:
+            estimate = await get_estimated_row_count(self.db, User.__tablename__)
+            if estimate is not None:
+                return estimate
+        return await self.db.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    async def get_all_user_data(
         self,
         search: str | None,
         filter_by: str | None,
@@ -143,7 +183,9 @@ class UserService:
         order_by: str,
         page: int | None,
         page_size: int | None,
-    ) -> Tuple[int, List[User]]:
+        cursor: str | None = None,
+        count_mode: CountModes = CountModes.EXACT,
+    ) -> Tuple[Optional[int], List[User], Optional[str]]:
         query = self.base_get_user_query()
 
         query = self.get_matched_user_based_on_search(query, search)
@@ -155,20 +197,65 @@ class UserService:
             filter_values=filter_values,
         )
 
-        query = apply_sorting(
-            query=query,
-            table=User,
-            custom_field_sorting=None,
-            sort_by=sort_by,
-            order_by=order_by,
-        )
-
-        total_count = query.count()
+        filtered_query = query
+        filtered = bool(search or (filter_by and filter_values))
+        # a window count after the keyset predicate would only cover the rows
+        # past the cursor, so fall back to a separate count there
+        if count_mode == CountModes.WINDOW and (cursor or not page_size):
+            count_mode = CountModes.EXACT
+        total_count = await self.count_users(query, count_mode, filtered)
+
+        if not page_size:
+            query = apply_sorting(
+                query=query,
+                table=User,
+                custom_field_sorting=None,
+                sort_by=sort_by,
+                order_by=order_by,
+            )
+            return total_count, (await self.db.scalars(query)).all(), None
 
-        if page and page_size:
-            query = apply_pagination(query, page, page_size)
+        # keyset order (sort column, id); a cursor replaces the page offset.
+        # searches are ranked by trigram similarity instead of the sort column
+        if search:
+            sort_column = self.get_search_rank(search)
+            order_by = OrderByTypes.DESC.value
+            query = query.add_columns(sort_column)
+        else:
+            sort_column = get_sort_column(User, None, sort_by)
+
+        if count_mode == CountModes.WINDOW:
+            query = query.add_columns(func.count().over().label("total_count"))
+
+        # a cursor is only valid for the search and filters it was issued for
+        params = [search, filter_by, filter_values]
+        query = apply_keyset_pagination(
+            query, sort_column, User.id, order_by, cursor, page_size, params
+        )
+        if not cursor and page:
+            query = query.offset(get_offset_value(page, page_size))
+
+        rows, next_cursor = split_keyset_page(
+            (await self.db.execute(query)).all(),
+            page_size,
+            sort_column,
+            User.id,
+            order_by,
+            get_entity=itemgetter(0),
+            params=params,
+        )
 
-        return total_count, query.all()
+        if count_mode == CountModes.WINDOW:
+            if rows:
+                total_count = rows[0].total_count
+            elif page and page > 1:
+                # paged past the end, the window had no rows to report on
+                total_count = await self.count_users(
+                    filtered_query, CountModes.EXACT, filtered
+                )
+            else:
+                total_count = 0
+        return total_count, [row[0] for row in rows], next_cursor
 
     def get_user_response(
         self, user: User, users: Dict[int, str]
@@ -188,7 +275,7 @@ class UserService:
             is_active=user.is_active,
         )
 
-    def get_user_responses(
+    async def get_user_responses(
         self,
         search: str | None,
         filter_by: str | None,
@@ -197,8 +284,10 @@ class UserService:
         order_by: str,
         page: int | None,
         page_size: int | None,
-    ) -> Tuple[int, List[GetUserDetailsResponse]]:
-        total_count, users_data = self.get_all_user_data(
+        cursor: str | None = None,
+        count_mode: CountModes = CountModes.EXACT,
+    ) -> Tuple[Optional[int], List[GetUserDetailsResponse], Optional[str]]:
+        total_count, users_data, next_cursor = await self.get_all_user_data(
             search=search,
             filter_by=filter_by,
             filter_values=filter_values,
@@ -206,15 +295,20 @@ class UserService:
             order_by=order_by,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count_mode=count_mode,
         )
 
-        users = get_all_users_dict(self.db)
+        users = await user_name_resolver.get_many(
+            self.db,
+            (uid for user in users_data for uid in (user.created_by, user.updated_by)),
+        )
 
         responses = [self.get_user_response(user, users) for user in users_data]
 
-        return total_count, responses
+        return total_count, responses, next_cursor
 
-    def get_all_users(
+    async def get_all_users(
         self,
         search: str | None,
         filter_by: str | None,
@@ -223,8 +317,10 @@ class UserService:
         order_by: str,
         page: int | None,
         page_size: int | None,
-    ) -> Tuple[int, List[GetUserDetailsResponse]]:
-        return self.get_user_responses(
+        cursor: str | None = None,
+        count_mode: CountModes = CountModes.EXACT,
+    ) -> Tuple[Optional[int], List[GetUserDetailsResponse], Optional[str]]:
+        return await self.get_user_responses(
             search=search,
             filter_by=filter_by,
             filter_values=filter_values,
@@ -232,13 +328,17 @@ class UserService:
             order_by=order_by,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            count_mode=count_mode,
         )
 
-    def get_user_by_id(self, user_id: int) -> GetUserDetailsResponse:
-        user = get_user_by_id(self.db, user_id)
+    async def get_user_by_id(self, user_id: int) -> GetUserDetailsResponse:
+        user = await get_user_by_id(self.db, user_id)
         self.validate_user_details(user)
 
-        users = get_all_users_dict(self.db)
+        users = await user_name_resolver.get_many(
+            self.db, [user.created_by, user.updated_by]
+        )
         return self.get_user_response(user, users)
 
     def get_user_info(self, request_state: Request):
@@ -249,13 +349,14 @@ class UserService:
             role=request_state.state.user.role.capitalize(),
         )
 
-    def save(self, user: User) -> User:
+    async def save(self, user: User) -> User:
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        await invalidate_tags("user:*")
         return user
 
-    def update(self, user: User) -> User:
-        self.db.commit()
-        self.db.refresh(user)
+    async def update(self, user: User) -> User:
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
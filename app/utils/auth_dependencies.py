@@ -1,43 +1,111 @@
-import os
-from dotenv import load_dotenv
-from jose import jwt
+import hashlib
+import time
+from typing import Optional
+
+from jose import JWTError, jwt
 from fastapi import Request, HTTPException, status
+from app.config import settings
 from app.models.user_models import CurrentContextUser
+from app.utils.lru_cache import LRUCache
 from app.utils.constants import AUTHORIZATION
+from app.utils.enums import Roles
 from fastapi import WebSocket
 
 
-load_dotenv()
-
-SECRET_KEY: str = os.getenv("JWT_SECRET")  # type: ignore
-ALGORITHM = "HS256"
+SECRET_KEY: str = settings.JWT_SECRET
+ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = 300  # 3 hours
 
+# token digest -> CurrentContextUser until the token expires, so each
+# token's signature is checked once per worker rather than on every request;
+# tokens that failed verification are remembered for a short while too
+_verified_tokens = LRUCache(settings.JWT_CACHE_SIZE)
+_rejected_tokens = LRUCache(
+    settings.JWT_NEGATIVE_CACHE_SIZE, ttl=settings.JWT_NEGATIVE_CACHE_TTL
+)
+
 
-def __verify_jwt(token: str):
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def verify_jwt(token: str) -> Optional[CurrentContextUser]:
+    """
+    The user an access token was issued to, None for other tokens such as
+    password-reset ones; raises JWTError when the token doesn't verify.
+    """
     token = token.replace("Bearer ", "")
-    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_sub": True})  # type: ignore
+    digest = _token_digest(token)
+    cur_user = _verified_tokens.get(digest)
+    if cur_user is not None:
+        return cur_user
+    if _rejected_tokens.get(digest) is not None:
+        raise JWTError("Invalid token")
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_sub": True})  # type: ignore
+    except JWTError:
+        if settings.JWT_NEGATIVE_CACHE_TTL > 0:
+            _rejected_tokens.set(digest, True)
+        raise
     user_email = payload.get("email")
 
-    if user_email:
-        cur_user = CurrentContextUser()
-        cur_user.id = payload.get("id")
-        cur_user.name = payload.get("name")
-        cur_user.email = str(user_email)
-        cur_user.role = payload.get("role")
+    if user_email and payload.get("id") is not None:
+        cur_user = CurrentContextUser(
+            id=payload["id"],
+            name=payload.get("name"),
+            email=str(user_email),
+            role=payload.get("role"),
+        )
+
+        ttl = settings.JWT_CACHE_TTL
+        if payload.get("exp") is not None:
+            ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            _verified_tokens.set(digest, cur_user, ttl=ttl)
         return cur_user
 
 
+def user_from_token(token: str) -> Optional[CurrentContextUser]:
+    """
+    The signed-in user for a bearer token, or None when it doesn't verify.
+    """
+    try:
+        return verify_jwt(token=token.strip())
+    except Exception:
+        return None
+
+
 async def verify_auth_token(request: Request):
     if "login" not in request.url.path and "refresh" not in request.url.path:
         auth: str = request.headers.get(AUTHORIZATION) or ""
         try:
             token = auth.strip()
-            request.state.user = __verify_jwt(token=token)
+            cur_user = verify_jwt(token=token)
         except Exception:
+            cur_user = None
+        if cur_user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token"
             )
+        request.state.user = cur_user
+
+
+def require_roles(*roles: Roles):
+    """
+    Dependency for protected routes open only to the given roles; runs after
+    `verify_auth_token` has set the caller.
+    """
+    allowed = {role.name for role in roles}
+
+    async def check_role(request: Request):
+        cur_user = getattr(request.state, "user", None)
+        if cur_user is None or cur_user.role not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
+            )
+
+    return check_role
 
 
 async def verify_auth_token_ws(websocket: WebSocket):
@@ -48,7 +116,9 @@ async def verify_auth_token_ws(websocket: WebSocket):
         return None
 
     try:
-        return __verify_jwt(token=token)
+        cur_user = verify_jwt(token=token)
     except Exception:
+        cur_user = None
+    if cur_user is None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return None
+    return cur_user
@@ -0,0 +1,784 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import inspect
+import logging
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.connectors.database_connector import (
+    build_async_db_session,
+    get_connected_schema,
+)
+from app.utils.compression import (
+    compress,
+    gzip_compress,
+    gzip_decompress,
+    mark_encoded,
+    negotiated_encoding,
+)
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import metrics
+from app.utils.redis_client import redis_binary_client, redis_client
+from app.utils.request_timing import current_request_timing
+
+
+logger = logging.getLogger("app.cache")
+
+
+M = TypeVar("M", bound=BaseModel)
+
+CACHE_TAG_KEY = "cache:tag:{}"
+CACHE_GENERATION_KEY = "cache:gen:{}"
+
+
+# ---------------- SERIALIZERS ----------------
+class JsonSerializer:
+    """
+    Turns a loaded value into the bytes kept in Redis and back. `loads`
+    gives the value kept in the local cache, `respond` what callers get.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=str)
+
+    def loads(self, raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+    def load_stored(self, stored: bytes) -> Any:
+        """
+        `loads` for a payload as kept in Redis, which may be compressed.
+        """
+        return self.loads(decompress_payload(stored))
+
+    def cached_value(self, value: Any, payload: bytes, stored: bytes) -> Any:
+        """
+        Same as `load_stored(stored)` for a value just dumped, without parsing.
+        """
+        return value
+
+    def respond(self, value: Any) -> Any:
+        return value
+
+
+class ModelSerializer(JsonSerializer, Generic[M]):
+    def __init__(self, model: Type[M]):
+        self.model = model
+
+    def dumps(self, value: M) -> bytes:
+        return super().dumps(value.model_dump())
+
+    def loads(self, raw: bytes) -> M:
+        return self.model(**super().loads(raw))
+
+
+class ModelListSerializer(ModelSerializer[M]):
+    def dumps(self, value: List[M]) -> bytes:
+        return JsonSerializer.dumps(self, [item.model_dump() for item in value])
+
+    def loads(self, raw: bytes) -> List[M]:
+        return [self.model(**item) for item in JsonSerializer.loads(self, raw)]
+
+
+def make_etag(payload: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "encoded")
+
+    def __init__(self, body: bytes, gzipped: Optional[bytes] = None):
+        self.body = body
+        self.etag = make_etag(body)
+        # encoding -> compressed body, kept so hits aren't compressed again
+        self.encoded = {"gzip": gzipped} if gzipped is not None else {}
+
+    def encode(self, encoding: str) -> bytes:
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+class ResponseSerializer(JsonSerializer):
+    """
+    Caches a route's whole response envelope as JSON bytes, encoded the way
+    FastAPI would, and answers hits with those bytes untouched: no parsing,
+    no model validation, no re-encoding. The body's hash is its ETag.
+    """
+
+    def dumps(self, value: BaseModel) -> bytes:
+        return orjson.dumps(value.model_dump(mode="json", by_alias=True))
+
+    def loads(self, raw: bytes) -> CachedResponse:
+        return CachedResponse(raw)
+
+    def load_stored(self, stored: bytes) -> CachedResponse:
+        return CachedResponse(decompress_payload(stored), gzipped_payload(stored))
+
+    def cached_value(
+        self, value: BaseModel, payload: bytes, stored: bytes
+    ) -> CachedResponse:
+        return CachedResponse(payload, gzipped_payload(stored))
+
+    def respond(self, value: CachedResponse) -> Response:
+        # a new Response per request; middlewares append to its headers
+        response = Response(
+            content=value.body,
+            media_type="application/json",
+            headers={"ETag": value.etag},
+        )
+        encoding = negotiated_encoding.get()
+        if encoding and len(value.body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+            # compressed here, once per entry, rather than by the middleware
+            # on every hit
+            response.body = value.encode(encoding)
+            mark_encoded(response.headers, encoding, len(response.body))
+        return response
+
+
+# ---------------- TAGS ----------------
+# An entry is stored together with the tags it depends on, e.g. `batch:12`
+# for one row or `batch:*` for a listing. Each tag is a Redis set of the keys
+# carrying it, so a write invalidates by tag instead of guessing key names.
+
+# Generations are the Redis time of a tag's last invalidation, in µs. A
+# rebuild notes them before it loads and stores nothing if any has moved on
+# by the time it is done: the rows it read may predate that write, and its
+# store would otherwise land after the invalidation deleted the key.
+
+# KEYS generations -> {now in µs, each generation or false}
+_snapshot_script = redis_client.register_script(
+    """
+    local now = redis.call("TIME")
+    local result = {now[1] .. string.format("%06d", tonumber(now[2]))}
+    for i = 1, #KEYS do
+        result[i + 1] = redis.call("GET", KEYS[i])
+    end
+    return result
+    """
+)
+
+# KEYS[1] entry, KEYS[2..n+1] tag sets, KEYS[n+2..2n+1] their generations;
+# ARGV[1] ttl, ARGV[2] payload, ARGV[3] load start (µs), ARGV[4..] the
+# generations noted then ("" for none), for the tags known up front. Tags
+# added while loading are checked against the start time instead.
+# -> 1 stored, 0 skipped
+_store_script = redis_client.register_script(
+    """
+    local ttl = tonumber(ARGV[1])
+    local started = tonumber(ARGV[3])
+    local tags = (#KEYS - 1) / 2
+    for i = 1, tags do
+        local generation = redis.call("GET", KEYS[1 + tags + i])
+        local noted = ARGV[3 + i]
+        if noted then
+            if (generation or "") ~= noted then
+                return 0
+            end
+        elseif generation and (tonumber(generation) or 0) >= started then
+            return 0
+        end
+    end
+
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ttl)
+    for i = 2, tags + 1 do
+        redis.call("SADD", KEYS[i], KEYS[1])
+        if redis.call("TTL", KEYS[i]) < ttl then
+            redis.call("EXPIRE", KEYS[i], ttl)
+        end
+    end
+    return 1
+    """
+)
+
+# KEYS[1..n] tag sets, KEYS[n+1..2n] their generations; deletes every member
+# and the sets, moves the generations on and returns the members
+_invalidate_script = redis_client.register_script(
+    """
+    local tags = #KEYS / 2
+    local now = redis.call("TIME")
+    local keys = {}
+    for i = 1, tags do
+        for _, key in ipairs(redis.call("SMEMBERS", KEYS[i])) do
+            keys[#keys + 1] = key
+        end
+        redis.call("DEL", KEYS[i])
+        redis.call("SET", KEYS[tags + i], now[1] .. string.format("%06d", tonumber(now[2])))
+    end
+    for i = 1, #keys, 1000 do
+        redis.call("DEL", unpack(keys, i, math.min(i + 999, #keys)))
+    end
+    return keys
+    """
+)
+
+# KEYS generations; starts missing ones at the current time so a generation
+# never repeats, even after Redis is flushed
+_generations_script = redis_client.register_script(
+    """
+    local now = redis.call("TIME")
+    local generations = {}
+    for i = 1, #KEYS do
+        local generation = redis.call("GET", KEYS[i])
+        if not generation then
+            generation = now[1] .. string.format("%06d", tonumber(now[2]))
+            redis.call("SET", KEYS[i], generation)
+        end
+        generations[i] = generation
+    end
+    return generations
+    """
+)
+
+_collected_tags: ContextVar[Optional[Set[str]]] = ContextVar(
+    "cache_collected_tags", default=None
+)
+
+
+def add_cache_tags(*tags: str) -> None:
+    """
+    Attach tags to the cache entry currently being loaded, if any. Lets the
+    code that reads a dependency tag it, e.g. every resolved user name adds
+    `user:{id}`.
+    """
+    collected = _collected_tags.get()
+    if collected is not None:
+        collected.update(tags)
+
+
+# ---------------- ENTRIES ----------------
+# Redis values are b"<fresh until, unix time>|<payload>"; the key itself
+# expires once the stale window has passed too. Payloads of at least
+# CACHE_COMPRESS_MIN_BYTES are compressed behind a marker byte, which JSON
+# never starts with, so plain and compressed entries can coexist. They are
+# gzip members, so cached responses can go out to clients exactly as stored;
+# older entries may still be raw zlib streams.
+ZLIB_MARKER = b"\x01"
+GZIP_MARKER = b"\x02"
+
+
+def compress_payload(payload: bytes) -> bytes:
+    min_bytes = settings.CACHE_COMPRESS_MIN_BYTES
+    if not min_bytes or len(payload) < min_bytes:
+        return payload
+    return GZIP_MARKER + gzip_compress(payload, settings.CACHE_COMPRESS_LEVEL)
+
+
+def decompress_payload(payload: bytes) -> bytes:
+    marker = payload[:1]
+    if marker == GZIP_MARKER:
+        return gzip_decompress(payload[1:])
+    if marker == ZLIB_MARKER:
+        return zlib.decompress(payload[1:])
+    return payload
+
+
+def gzipped_payload(stored: bytes) -> Optional[bytes]:
+    return stored[1:] if stored[:1] == GZIP_MARKER else None
+
+
+def encode_entry(stored: bytes, ttl: int) -> bytes:
+    return b"%.3f|%s" % (time.time() + ttl, stored)
+
+
+def decode_entry(raw: bytes) -> Optional[Tuple[float, bytes]]:
+    """
+    (fresh until, payload as stored) for a Redis value.
+    """
+    fresh_until, _, stored = raw.partition(b"|")
+    try:
+        fresh_until = float(fresh_until)
+    except ValueError:
+        # written before entries carried a freshness stamp
+        return None
+    return fresh_until, stored
+
+
+# ---------------- LOCKS ----------------
+CACHE_LOCK_KEY = "cache:lock:{}"
+
+# KEYS[1] lock; ARGV[1] owner token
+_release_lock_script = redis_client.register_script(
+    """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    return 0
+    """
+)
+
+
+async def acquire_lock(key: str, timeout: float) -> Optional[str]:
+    """
+    Take the cross-worker rebuild lock for a cache key, returning the owner
+    token, or None when another worker holds it.
+    """
+    token = uuid.uuid4().hex
+    acquired = await redis_client.set(
+        CACHE_LOCK_KEY.format(key), token, nx=True, px=int(timeout * 1000)
+    )
+    return token if acquired else None
+
+
+async def release_lock(key: str, token: str) -> None:
+    await _release_lock_script(keys=[CACHE_LOCK_KEY.format(key)], args=[token])
+
+
+# ---------------- NAMESPACES ----------------
+class CacheNamespace:
+    """
+    A family of cache keys sharing a local LRU (L1) in front of Redis (L2).
+
+    L1 entries live for `local_ttl` seconds only: other workers can't reach
+    this process's LRU when they invalidate a key.
+
+    Redis entries are fresh for `ttl` seconds and then served stale for
+    `stale_ttl` more while one caller refreshes them in the background. A
+    missing entry is rebuilt once: concurrent callers in this worker wait on
+    the same future and other workers wait on a Redis lock.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local_size: int,
+        local_ttl: float,
+        stale_ttl: int,
+        lock_timeout: float,
+    ):
+        self.name = name
+        self.local = LRUCache(maxsize=local_size, ttl=local_ttl)
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.pending: Dict[str, asyncio.Future] = {}
+        # tags of the loads running in this worker, as they are collected
+        self.loading: Dict[str, Set[str]] = {}
+        self.refreshing: Set[str] = set()
+        self.background: Set[asyncio.Task] = set()
+        prefix = f"cache.{name}"
+        self.l1_hits = metrics.counter(f"{prefix}.l1_hits")
+        self.l2_hits = metrics.counter(f"{prefix}.l2_hits")
+        self.stale_hits = metrics.counter(f"{prefix}.stale_hits")
+        self.misses = metrics.counter(f"{prefix}.misses")
+        self.shared_loads = metrics.counter(f"{prefix}.shared_loads")
+        self.lock_waits = metrics.counter(f"{prefix}.lock_waits")
+        self.refresh_errors = metrics.counter(f"{prefix}.refresh_errors")
+        self.discarded_stores = metrics.counter(f"{prefix}.discarded_stores")
+        self.l2_seconds = metrics.histogram(f"{prefix}.l2_seconds")
+        self.load_seconds = metrics.histogram(f"{prefix}.load_seconds")
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Any],
+        ttl: int,
+        serializer: JsonSerializer,
+        tags: Iterable[str] = (),
+        refresh: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Returns the cached value, see `JsonSerializer`. `load` runs in the
+        caller's context; `refresh`, when given, must not depend on the
+        caller's request since it may outlive it.
+        """
+        missing = object()
+        value = self.local.get(key, missing)
+        if value is not missing:
+            self.l1_hits.inc()
+            return value
+
+        start = time.perf_counter()
+        raw = await redis_binary_client.get(key)
+        self.l2_seconds.observe(time.perf_counter() - start)
+        entry = decode_entry(raw) if raw is not None else None
+        if entry is not None:
+            fresh_until, stored = entry
+            value = serializer.load_stored(stored)
+            if fresh_until > time.time():
+                self.l2_hits.inc()
+                self.local.set(key, value)
+            else:
+                self.stale_hits.inc()
+                if refresh is not None:
+                    self.refresh_in_background(key, refresh, ttl, serializer, tags)
+            return value
+
+        self.misses.inc()
+        pending = self.pending.get(key)
+        if pending is not None:
+            self.shared_loads.inc()
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # the caller that was loading went away; load it ourselves
+
+        pending = self.pending[key] = asyncio.get_running_loop().create_future()
+        # keeps asyncio quiet when nobody else was waiting for the result
+        pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            value = await self.rebuild(key, load, ttl, serializer, tags)
+        except Exception as exc:
+            pending.set_exception(exc)
+            raise
+        except BaseException:
+            pending.cancel()
+            raise
+        else:
+            pending.set_result(value)
+        finally:
+            if self.pending.get(key) is pending:
+                del self.pending[key]
+        return value
+
+    async def rebuild(
+        self,
+        key: str,
+        load: Callable[[], Any],
+        ttl: int,
+        serializer: JsonSerializer,
+        tags: Iterable[str],
+    ) -> Any:
+        token = await acquire_lock(key, self.lock_timeout)
+        if token is None:
+            # another worker is rebuilding; wait for its value, up to the
+            # lock timeout, before loading it here as well
+            self.lock_waits.inc()
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                raw = await redis_binary_client.get(key)
+                entry = decode_entry(raw) if raw is not None else None
+                if entry is not None:
+                    return serializer.load_stored(entry[1])
+                if not await redis_client.exists(CACHE_LOCK_KEY.format(key)):
+                    break
+        try:
+            return await self.load_and_store(key, load, ttl, serializer, tags)
+        finally:
+            if token is not None:
+                await release_lock(key, token)
+
+    async def load_and_store(
+        self,
+        key: str,
+        load: Callable[[], Any],
+        ttl: int,
+        serializer: JsonSerializer,
+        tags: Iterable[str],
+    ) -> Any:
+        declared = list(dict.fromkeys(tags))
+        started, *noted = await _snapshot_script(
+            keys=[CACHE_GENERATION_KEY.format(tag) for tag in declared]
+        )
+        collected = self.loading[key] = set(declared)
+        token = _collected_tags.set(collected)
+        start = time.perf_counter()
+        try:
+            value = await load()
+        finally:
+            _collected_tags.reset(token)
+            if self.loading.get(key) is collected:
+                del self.loading[key]
+        self.load_seconds.observe(time.perf_counter() - start)
+        # an outer entry being loaded depends on everything this one does
+        add_cache_tags(*collected)
+
+        ordered = declared + sorted(collected.difference(declared))
+        payload = serializer.dumps(value)
+        stored = compress_payload(payload)
+        kept = await _store_script(
+            keys=[
+                key,
+                *(CACHE_TAG_KEY.format(tag) for tag in ordered),
+                *(CACHE_GENERATION_KEY.format(tag) for tag in ordered),
+            ],
+            args=[
+                ttl + self.stale_ttl,
+                encode_entry(stored, ttl),
+                started,
+                *(generation or "" for generation in noted),
+            ],
+        )
+        value = serializer.cached_value(value, payload, stored)
+        if kept:
+            self.local.set(key, value)
+        else:
+            # a write landed while loading; this caller gets what it read,
+            # nobody else does
+            self.discarded_stores.inc()
+        return value
+
+    def forget_loads(self, keys: Iterable[str], tags: Iterable[str]) -> None:
+        """
+        Stop callers joining loads of `keys`, or of entries carrying `tags`,
+        that are already running; they may have read rows a write has since
+        replaced. The loads themselves finish for their own caller.
+        """
+        tags = set(tags)
+        stale = set(keys)
+        stale.update(key for key, loading in self.loading.items() if loading & tags)
+        for key in stale:
+            self.pending.pop(key, None)
+
+    def refresh_in_background(
+        self,
+        key: str,
+        refresh: Callable[[], Any],
+        ttl: int,
+        serializer: JsonSerializer,
+        tags: Iterable[str],
+    ) -> None:
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+        task = asyncio.create_task(
+            self._refresh(key, refresh, ttl, serializer, tuple(tags))
+        )
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    async def _refresh(
+        self,
+        key: str,
+        refresh: Callable[[], Any],
+        ttl: int,
+        serializer: JsonSerializer,
+        tags: Iterable[str],
+    ) -> None:
+        # the task inherited the request's context; it must not report into it
+        _collected_tags.set(None)
+        current_request_timing.set(None)
+        try:
+            token = await acquire_lock(key, self.lock_timeout)
+            if token is None:
+                return
+            try:
+                await self.load_and_store(key, refresh, ttl, serializer, tags)
+            finally:
+                await release_lock(key, token)
+        except Exception:
+            self.refresh_errors.inc()
+            logger.exception("background refresh of %s failed", key)
+        finally:
+            self.refreshing.discard(key)
+
+
+cache_namespaces: Dict[str, CacheNamespace] = {}
+
+
+def get_namespace(name: str) -> CacheNamespace:
+    namespace = cache_namespaces.get(name)
+    if namespace is None:
+        namespace = cache_namespaces[name] = CacheNamespace(
+            name,
+            local_size=settings.CACHE_LOCAL_SIZE,
+            local_ttl=settings.CACHE_LOCAL_TTL,
+            stale_ttl=settings.CACHE_STALE_TTL,
+            lock_timeout=settings.CACHE_LOCK_TIMEOUT,
+        )
+    return namespace
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """
+    Drop every entry carrying any of the tags, in a single Redis call, and
+    the same keys from this worker's local caches. Loads already running
+    are not stored over it, see `_store_script`.
+    """
+    if not tags:
+        return
+    keys = await _invalidate_script(
+        keys=[
+            *(CACHE_TAG_KEY.format(tag) for tag in tags),
+            *(CACHE_GENERATION_KEY.format(tag) for tag in tags),
+        ]
+    )
+    for namespace in cache_namespaces.values():
+        if keys:
+            namespace.local.delete(*keys)
+        # later callers, the rewarm included, load again after the write
+        namespace.forget_loads(keys, tags)
+    if keys and settings.CACHE_REWARM_ON_INVALIDATE:
+        cache_warmer.rewarm(keys)
+
+
+async def generations_etag(*tags: str, context: str = "") -> str:
+    """
+    ETag that changes whenever any of the tags is invalidated, for responses
+    that aren't cached but only change along with these tags. `context`
+    covers anything else the response depends on, e.g. the date range it
+    reports on.
+    """
+    generations = await _generations_script(
+        keys=[CACHE_GENERATION_KEY.format(tag) for tag in tags]
+    )
+    return make_etag(
+        "|".join(
+            [context, *(f"{tag}={gen}" for tag, gen in zip(tags, generations))]
+        ).encode()
+    )
+
+
+# ---------------- WARMING ----------------
+class CacheWarmer:
+    """
+    Reloads hot cache keys ahead of the requests that would otherwise pay
+    for the rebuild: all of them on startup and, when enabled, each one
+    again right after an invalidation drops it.
+
+    A warmer is a coroutine function that loads its key through the cached
+    service method, opening its own database session.
+    """
+
+    def __init__(self):
+        self.warmers: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        # keys being re-warmed -> whether another invalidation came meanwhile
+        self.rewarming: Dict[str, bool] = {}
+        self.background: Set[asyncio.Task] = set()
+        self.warmed = metrics.counter("cache.warmer.warmed")
+        self.errors = metrics.counter("cache.warmer.errors")
+
+    def register(self, key: str, warm: Callable[[], Awaitable[Any]]) -> None:
+        self.warmers[key] = warm
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+        return task
+
+    async def _warm_key(self, key: str) -> None:
+        # spawned from a request: don't report into its timings or tags
+        _collected_tags.set(None)
+        current_request_timing.set(None)
+        try:
+            await self.warmers[key]()
+            self.warmed.inc()
+        except Exception:
+            self.errors.inc()
+            logger.exception("warming %s failed", key)
+
+    async def warm_all(self, concurrency: int, deadline: float) -> None:
+        """
+        Warm every registered key, `concurrency` at a time, returning after
+        `deadline` seconds at the latest; keys still loading by then finish
+        in the background.
+        """
+        if not self.warmers:
+            return
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(key: str) -> None:
+            async with semaphore:
+                await self._warm_key(key)
+
+        tasks = [self._spawn(warm(key)) for key in self.warmers]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            logger.warning(
+                "cache warm-up passed its %.1fs deadline with %d keys left",
+                deadline,
+                len(pending),
+            )
+
+    def rewarm(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            if key not in self.warmers:
+                continue
+            if key in self.rewarming:
+                # the running load may have read the data before this write
+                self.rewarming[key] = True
+                continue
+            self.rewarming[key] = False
+            self._spawn(self._rewarm(key))
+
+    async def _rewarm(self, key: str) -> None:
+        try:
+            while True:
+                await self._warm_key(key)
+                if not self.rewarming[key]:
+                    break
+                self.rewarming[key] = False
+        finally:
+            del self.rewarming[key]
+
+
+cache_warmer = CacheWarmer()
+
+
+# ---------------- DECORATOR ----------------
+def cached(
+    namespace: str,
+    key: str,
+    ttl: int,
+    serializer: Optional[JsonSerializer] = None,
+    tags: Iterable[str] = (),
+):
+    """
+    Read-through cache for an async service method.
+
+    `key` and `tags` are templates formatted with the method's arguments, e.g.
+    `"cache:batches:{batch_id}"` and `"batch:{batch_id}"`; `self` is never
+    part of the key. Tags added with `add_cache_tags` while the method runs
+    are stored alongside.
+
+    Stale entries are refreshed in the background on a service copy with its
+    own session, as the request's session is closed once it responds.
+    """
+    tags = tuple(tags)
+    serializer = serializer or JsonSerializer()
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            cache_key = key.format(**bound.arguments)
+            service, *rest = args
+
+            async def refresh():
+                schema = get_connected_schema(service.db)
+                async with build_async_db_session(schema) as db:
+                    detached = dataclasses.replace(service, db=db)
+                    return await func(detached, *rest, **kwargs)
+
+            value = await get_namespace(namespace).get_or_load(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl,
+                serializer,
+                tags=[tag.format(**bound.arguments) for tag in tags],
+                refresh=refresh,
+            )
+            return serializer.respond(value)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,134 @@
+import zlib
+from contextvars import ContextVar
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+# preferred first when the client accepts both equally
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# encoding the current request accepts, set by CompressionMiddleware so
+# cached responses can answer with a body compressed ahead of time
+negotiated_encoding: ContextVar[Optional[str]] = ContextVar(
+    "negotiated_encoding", default=None
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    The best of ENCODINGS the `Accept-Encoding` header allows, if any.
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def gzip_compress(data: bytes, level: int) -> bytes:
+    # a gzip member with mtime 0, so equal bodies compress to equal bytes
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def gzip_decompress(data: bytes) -> bytes:
+    return zlib.decompress(data, 31)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(
+            body, mode=brotli.MODE_TEXT, quality=settings.RESPONSE_BROTLI_QUALITY
+        )
+    return gzip_compress(body, settings.RESPONSE_GZIP_LEVEL)
+
+
+def weak_etag(etag: str) -> str:
+    # the compressed body is a different representation of the same entity
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+def mark_encoded(headers: MutableHeaders, encoding: str, length: int) -> None:
+    headers["Content-Encoding"] = encoding
+    headers["Content-Length"] = str(length)
+    headers.add_vary_header("Accept-Encoding")
+    if "etag" in headers:
+        headers["ETag"] = weak_etag(headers["etag"])
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON and text responses of at least `minimum_size` bytes with
+    the best encoding the client accepts.
+
+    Only single-message bodies are compressed; streamed responses, such as
+    the notification proxy's, and websockets pass through untouched, as do
+    responses that already carry a `Content-Encoding`.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # held back until the body shows whether it is worth it
+                start_message = message
+                return
+            if start_message is None:
+                return await send(message)
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body") or not self._compressible(start, body):
+                await send(start)
+                return await send(message)
+
+            compressed = compress(body, encoding)
+            mark_encoded(MutableHeaders(scope=start), encoding, len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        token = negotiated_encoding.set(encoding)
+        try:
+            await self.app(scope, receive, send_compressed)
+        finally:
+            negotiated_encoding.reset(token)
+
+    def _compressible(self, start: Message, body: bytes) -> bool:
+        if len(body) < self.minimum_size or start["status"] in (204, 304):
+            return False
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
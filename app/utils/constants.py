@@ -13,6 +13,10 @@ TEMPLATE_FILE_EXTENTION = ".html.jinja"
 INVALID_TOKEN = "INVALID_TOKEN"
 UPDATED_AT = "updated_at"
 COLUMN_NOT_FOUND = "COLUMN_NOT_FOUND"
+COLUMN_NOT_SORTABLE = "COLUMN_NOT_SORTABLE"
+INVALID_CURSOR = "INVALID_CURSOR"
+DEFAULT_LIST_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 # USER MANAGEMENT SERVICE RELATED CONSTANTS:
 INCORRECT_PASSWORD = "INCORRECT_PASSWORD"
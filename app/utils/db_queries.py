@@ -1,7 +1,7 @@
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.entities.batch import Batch
 from app.entities.class_schedule import ClassSchedule
@@ -12,144 +12,193 @@ from app.entities.syllabus import Syllabus
 from app.entities.user import User
 
 
+# ----------------------- STATISTICS QUERIES ------------------:
+async def get_estimated_row_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Row count estimate kept by VACUUM/ANALYZE in pg_class.reltuples.
+    Returns None when the table has never been analyzed.
+    """
+    estimate = await db.scalar(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
 # ----------------------- USER QUERIES ------------------------:
-def get_users(db: Session) -> List[User]:
+async def get_users(db: AsyncSession) -> List[User]:
     """
     Get all users.
     """
-    return db.query(User).all()
+    return (await db.scalars(select(User))).all()
+
+
+async def get_user_names_by_ids(db: AsyncSession, user_ids: List[int]):
+    """
+    Get (id, name) rows for the given user ids.
+    """
+    return (
+        await db.execute(select(User.id, User.name).where(User.id.in_(user_ids)))
+    ).all()
 
 
-def get_user_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.scalar(select(User).where(User.id == user_id).limit(1))
 
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(
+        select(User).where(func.lower(User.email) == email.lower()).limit(1)
+    )
 
 
-def get_user_by_phone_number(db: Session, phone_number: str):
-    return db.query(User).filter(User.phone_number == phone_number).first()
+async def get_user_by_phone_number(db: AsyncSession, phone_number: str):
+    return await db.scalar(
+        select(User).where(User.phone_number == phone_number).limit(1)
+    )
 
 
 # ----------------------- Mentor QUERIES ----------------------:
-def get_mentor_profile_by_user_id(db, user_id: int):
-    return db.query(MentorProfile).filter(MentorProfile.user_id == user_id).first()
+async def get_mentor_profile_by_user_id(db: AsyncSession, user_id: int):
+    return await db.scalar(
+        select(MentorProfile).where(MentorProfile.user_id == user_id).limit(1)
+    )
 
 
 # ---------------------- SYLLABUS QUERIES ----------------------:
 
 
-def get_syllabus(db: Session, syllabus_id: int) -> Syllabus:
+async def get_syllabus(db: AsyncSession, syllabus_id: int) -> Syllabus:
     """
     Get syllabus by id.
     """
-    return db.query(Syllabus).filter(Syllabus.id == syllabus_id).first()
+    return await db.scalar(select(Syllabus).where(Syllabus.id == syllabus_id).limit(1))
 
 
-def get_all_syllabus(db: Session) -> List[Syllabus]:
+async def get_all_syllabus(db: AsyncSession) -> List[Syllabus]:
     """
     Get all syllabus.
     """
-    return db.query(Syllabus).all()
+    return (await db.scalars(select(Syllabus))).all()
 
 
-def get_syllabus_by_name(db: Session, name: str) -> Syllabus:
+async def get_syllabus_by_name(db: AsyncSession, name: str) -> Syllabus:
     """
     Get syllabus by name.
     """
-    return db.query(Syllabus).filter(func.lower(Syllabus.name) == name.lower()).first()
+    return await db.scalar(
+        select(Syllabus).where(func.lower(Syllabus.name) == name.lower()).limit(1)
+    )
 
 
-def count_syllabus_by_ids(db: Session, syllabus_ids: List[int]) -> int:
+async def get_syllabus_by_ids(
+    db: AsyncSession, syllabus_ids: List[int]
+) -> List[Syllabus]:
     """
-    Count the number of syllabus entries matching the given IDs.
+    Get syllabus entries matching the given IDs.
     """
     return (
-        db.query(func.count(Syllabus.id)).filter(Syllabus.id.in_(syllabus_ids)).scalar()
+        await db.scalars(select(Syllabus).where(Syllabus.id.in_(syllabus_ids)))
+    ).all()
+
+
+async def count_syllabus_by_ids(db: AsyncSession, syllabus_ids: List[int]) -> int:
+    """
+    Count the number of syllabus entries matching the given IDs.
+    """
+    return await db.scalar(
+        select(func.count(Syllabus.id)).where(Syllabus.id.in_(syllabus_ids))
     )
 
 
 # ---------------------- BATCH QUERIES ----------------------:
 
 
-def get_batch(db: Session, batch_id: int) -> Batch:
+async def get_batch(db: AsyncSession, batch_id: int) -> Batch:
     """
     Get batch by id.
     """
-    return db.query(Batch).filter(Batch.id == batch_id).first()
+    return await db.scalar(select(Batch).where(Batch.id == batch_id).limit(1))
 
 
-def get_all_batches(db: Session) -> List[Batch]:
+async def get_all_batches(db: AsyncSession) -> List[Batch]:
     """
     Get all batches.
     """
-    return db.query(Batch).all()
+    return (await db.scalars(select(Batch))).all()
 
 
-def get_batch_class_schedules(db: Session, batch_id: int):
-    return db.query(ClassSchedule).filter_by(batch_id=batch_id, is_active=True).all()
+async def get_batch_class_schedules(db: AsyncSession, batch_id: int):
+    return (
+        await db.scalars(
+            select(ClassSchedule).filter_by(batch_id=batch_id, is_active=True)
+        )
+    ).all()
 
 
-def get_class_schedule_by_batch_and_time(
-    db: Session, batch_id: int, day: str, start_time: str
+async def get_class_schedule_by_batch_and_time(
+    db: AsyncSession, batch_id: int, day: str, start_time: str
 ) -> ClassSchedule:
     """
     Get class schedule by batch ID, day, and start time.
     """
-    return (
-        db.query(ClassSchedule)
+    return await db.scalar(
+        select(ClassSchedule)
         .filter_by(batch_id=batch_id, day=day, start_time=start_time, is_active=True)
-        .first()
+        .limit(1)
     )
 
 
-def get_class_schedule_by_id(
-    db: Session, schedule_id: int, batch_id: int
+async def get_class_schedule_by_id(
+    db: AsyncSession, schedule_id: int, batch_id: int
 ) -> ClassSchedule:
     """
     Get class schedule by ID.
     """
-    return (
-        db.query(ClassSchedule)
+    return await db.scalar(
+        select(ClassSchedule)
         .filter_by(id=schedule_id, batch_id=batch_id, is_active=True)
-        .first()
+        .limit(1)
     )
 
 
 # ---------------------- STUDENT QUERIES ----------------------:
 
 
-def get_student_by_id(db: Session, user_id: int) -> Student:
+async def get_student_by_id(db: AsyncSession, user_id: int) -> Student:
     """
     Get student email by id.
     """
-    return db.query(Student).filter(Student.user_id == user_id).first()
+    return await db.scalar(select(Student).where(Student.user_id == user_id).limit(1))
 
 
-def get_student(db: Session, student_id: int) -> Student:
+async def get_student(db: AsyncSession, student_id: int) -> Student:
     """
     Get student by id.
     """
-    return db.query(Student).filter(Student.id == student_id).first()
+    return await db.scalar(select(Student).where(Student.id == student_id).limit(1))
 
 
-def get_students(db: Session) -> List[Student]:
+async def get_students(db: AsyncSession) -> List[Student]:
     """
     Get all students.
     """
-    return db.query(Student).all()
+    return (await db.scalars(select(Student))).all()
 
 
-def get_mapped_batch_student(db: Session, mapping_id: int) -> BatchStudent:
-    return db.query(BatchStudent).filter(BatchStudent.id == mapping_id).first()
+async def get_mapped_batch_student(db: AsyncSession, mapping_id: int) -> BatchStudent:
+    return await db.scalar(
+        select(BatchStudent).where(BatchStudent.id == mapping_id).limit(1)
+    )
 
 
-def get_student_in_batch(db: Session, student_id: int, batch_id: int) -> BatchStudent:
-    return (
-        db.query(BatchStudent)
-        .filter(
-            BatchStudent.student_id == student_id, BatchStudent.batch_id == batch_id
-        )
-        .first()
+async def get_student_in_batch(
+    db: AsyncSession, student_id: int, batch_id: int
+) -> BatchStudent:
+    return await db.scalar(
+        select(BatchStudent)
+        .where(BatchStudent.student_id == student_id, BatchStudent.batch_id == batch_id)
+        .limit(1)
     )
@@ -19,6 +19,13 @@ class OrderByTypes(str, Enum):
     DESC = "desc"
 
 
+class CountModes(str, Enum):
+    EXACT = "exact"  # separate count(*) query
+    WINDOW = "window"  # count(*) OVER () alongside the page
+    ESTIMATED = "estimated"  # planner statistics; unfiltered listings only
+    NONE = "none"  # no total, only has_more
+
+
 # 👇 ADD THIS
 class Days(IntEnum):
     MONDAY = 1
@@ -1,6 +1,21 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import settings
+from app.utils.metrics import metrics
+
+# hashes below the configured cost count as outdated and are redone at login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 
 class Hasher():
@@ -10,4 +25,82 @@ class Hasher():
 
     @staticmethod
     def get_password_hash(password):
-        return pwd_context.hash(password)
\ No newline at end of file
+        return pwd_context.hash(password)
+
+    @staticmethod
+    def verify_and_update(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+        """
+        (valid, new hash) where the new hash is only given when the stored one
+        was made with outdated settings.
+        """
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt on a dedicated thread pool so a hash never blocks the event
+    loop; bcrypt releases the GIL while it works, so threads run in parallel.
+
+    At most `max_pending` calls wait or run at once. Past that, callers get
+    a 503 straight away instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._rejected = metrics.counter("password_hash.rejected")
+        self._wait_seconds = metrics.histogram("password_hash.wait_seconds")
+        self._run_seconds = metrics.histogram("password_hash.run_seconds")
+        metrics.gauge("password_hash.pending", lambda: self.pending)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(Hasher.get_password_hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(Hasher.verify_and_update, password, hashed_password)
+
+    async def _run(self, fn: Callable, *args):
+        if self.pending >= self.max_pending:
+            self._rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service temporarily unavailable. Please try again later.",
+            )
+
+        queued = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self._wait_seconds.observe(started - queued)
+            try:
+                return fn(*args)
+            finally:
+                self._run_seconds.observe(time.perf_counter() - started)
+
+        loop = asyncio.get_running_loop()
+
+        def finished(_):
+            try:
+                loop.call_soon_threadsafe(self._finished)
+            except RuntimeError:
+                pass  # the loop closed while the job ran
+
+        job = self._executor.submit(timed)
+        self.pending += 1
+        # counted until the job itself is done: a caller that goes away
+        # leaves bcrypt running on its thread
+        job.add_done_callback(finished)
+        return await asyncio.wrap_future(job)
+
+    def _finished(self) -> None:
+        self.pending -= 1
+
+
+password_hasher = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING
+)
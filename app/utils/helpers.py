@@ -1,32 +1,20 @@
-from typing import Any, Dict
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.sql.elements import Label
 
-from app.connectors.database_connector import get_database, get_db
-from app.utils.constants import COLUMN_NOT_FOUND
-from app.utils.db_queries import get_users
+from app.config import settings
+from app.utils.constants import COLUMN_NOT_FOUND, COLUMN_NOT_SORTABLE, INVALID_CURSOR
 from app.utils.enums import OrderByTypes
 
 
-def get_all_users_dict(db: Session) -> dict:
-    """
-    Get all users from the database and return them as a dictionary.
-    """
-    users = get_users(db)
-    return {user.id: user.name for user in users}
-
-
-
-
-
-def get_all_users() -> Dict[int, str]:
-    with get_database() as db:
-        users = get_all_users_dict(db)
-
-    return users
-
-
 def apply_filter(
     query,
     main_table: Any,
@@ -69,18 +57,21 @@ def apply_filter(
     return query
 
 
+def get_sort_column(table: Any, custom_field_sorting: Any, sort_by: str):
+    if custom_field_sorting is not None:
+        return custom_field_sorting
+    try:
+        return getattr(table, sort_by.strip().lower())
+    except AttributeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=COLUMN_NOT_FOUND
+        )
+
+
 def apply_sorting(
     query, table: Any, custom_field_sorting: Any, sort_by: str, order_by: str
 ):
-    if custom_field_sorting is None:
-        try:
-            sort_column = getattr(table, sort_by.strip().lower())
-        except AttributeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail=COLUMN_NOT_FOUND
-            )
-    else:
-        sort_column = custom_field_sorting
+    sort_column = get_sort_column(table, custom_field_sorting, sort_by)
 
     if order_by.lower() == OrderByTypes.DESC.value:
         return query.order_by(sort_column.desc())
@@ -101,3 +92,183 @@ def apply_pagination(query, page: int, page_size: int):
     """
     offset = get_offset_value(page, page_size)
     return query.limit(page_size).offset(offset)
+
+
+# ┌────────────────────────────── CURSOR PAGINATION ───────────────────────────────────────────┐
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _cursor_signature(payload: bytes) -> bytes:
+    return hmac.new(settings.JWT_SECRET.encode(), payload, hashlib.sha256).digest()[:16]
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR)
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """
+    Build an opaque cursor carrying the sort key values of the last row seen,
+    for the listing described by `scope`, see `cursor_scope`. Cursors are
+    signed so clients can't forge arbitrary keyset bounds.
+    """
+    payload = json.dumps(
+        [
+            scope,
+            [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values],
+        ],
+        separators=(",", ":"),
+    ).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_cursor_signature(payload))}"
+
+
+def decode_cursor(cursor: str, scope: str) -> List[Any]:
+    try:
+        payload_part, signature_part = cursor.split(".")
+        payload = _b64decode(payload_part)
+        signature = _b64decode(signature_part)
+    except (ValueError, binascii.Error):
+        raise _invalid_cursor()
+
+    if not hmac.compare_digest(signature, _cursor_signature(payload)):
+        raise _invalid_cursor()
+
+    cursor_scope, values = json.loads(payload)
+    # a cursor only makes sense for the listing and ordering it was issued for
+    if cursor_scope != scope:
+        raise _invalid_cursor()
+
+    return [
+        datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in values
+    ]
+
+
+def cursor_scope(
+    sort_column: Any, id_column: Any, order_by: str, params: Sequence[Any] = ()
+) -> str:
+    """
+    What a cursor is valid for: the listing, named by its id column, the sort
+    column and direction, and a digest of the `params` that select its rows,
+    such as search terms and filters.
+    """
+    digest = hashlib.blake2b(
+        json.dumps(list(params), default=str, separators=(",", ":")).encode(),
+        digest_size=8,
+    ).hexdigest()
+    return f"{id_column}:{sort_column.key}:{order_by.lower()}:{digest}"
+
+
+def _keyset_columns(sort_column: Any, id_column: Any) -> list:
+    return [sort_column] if sort_column is id_column else [sort_column, id_column]
+
+
+def apply_keyset_pagination(
+    query,
+    sort_column: Any,
+    id_column: Any,
+    order_by: str,
+    cursor: Optional[str],
+    page_size: int,
+    params: Sequence[Any] = (),
+):
+    """
+    Order by (sort column, id) and, given a cursor, continue after the row it
+    points to. Fetches one extra row so `split_keyset_page` can tell whether
+    another page follows. `params` are the request parameters that select
+    the rows; a cursor issued for other ones is rejected.
+
+    Nullable sort columns are rejected: NULLs fail every keyset comparison,
+    so rows holding them would be skipped by the pages after the first.
+    """
+    if getattr(sort_column, "nullable", False):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=COLUMN_NOT_SORTABLE
+        )
+
+    columns = _keyset_columns(sort_column, id_column)
+    descending = order_by.lower() == OrderByTypes.DESC.value
+
+    if cursor:
+        values = decode_cursor(
+            cursor, cursor_scope(sort_column, id_column, order_by, params)
+        )
+        if len(values) != len(columns):
+            raise _invalid_cursor()
+        keyset, bound = (
+            (columns[0], values[0])
+            if len(columns) == 1
+            else (tuple_(*columns), tuple_(*values))
+        )
+        query = query.filter(keyset < bound if descending else keyset > bound)
+
+    return query.order_by(
+        *[column.desc() if descending else column.asc() for column in columns]
+    ).limit(page_size + 1)
+
+
+def split_keyset_page(
+    rows: Sequence[Any],
+    page_size: int,
+    sort_column: Any,
+    id_column: Any,
+    order_by: str,
+    get_entity: Optional[Callable[[Any], Any]] = None,
+    params: Sequence[Any] = (),
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim the extra row fetched by `apply_keyset_pagination` and return the
+    page with the cursor of the next one, or None on the last page. Takes
+    the ordering and `params` given to `apply_keyset_pagination`.
+    `get_entity` picks the object holding the sort key out of a result row.
+    """
+    if len(rows) <= page_size:
+        return list(rows), None
+
+    page = list(rows[:page_size])
+    last = get_entity(page[-1]) if get_entity else page[-1]
+    # labelled expressions are selected next to the entity, read them off the row
+    values = [
+        getattr(page[-1] if isinstance(column, Label) else last, column.key)
+        for column in _keyset_columns(sort_column, id_column)
+    ]
+    return page, encode_cursor(
+        cursor_scope(sort_column, id_column, order_by, params), values
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's `If-None-Match` already names this ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # weak comparison: compressed responses carry the W/ form of the tag
+    etag = etag.removeprefix("W/")
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def conditional_response(request: Request, response: Any) -> Any:
+    """
+    Answer with 304 when the client already holds the ETag of a response
+    served from the cache; anything else is returned as is.
+    """
+    if isinstance(response, Response):
+        etag = response.headers.get("etag")
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+    return response
@@ -1,9 +1,10 @@
 import subprocess
 import os
 from fastapi import FastAPI
+from app.services.cache_warmup_service import warm_up_cache
 from app.services.database_update_service import DatabaseUpdateService
 
-proc: subprocess.Popen
+proc: subprocess.Popen | None = None
 
 
 def start_dramatique_process():
@@ -38,4 +39,5 @@ def __on_app_finished():
 
 def setup_event_handlers(app: FastAPI):
     app.add_event_handler("startup", __on_app_started)
+    app.add_event_handler("startup", warm_up_cache)
     app.add_event_handler("shutdown", __on_app_finished)
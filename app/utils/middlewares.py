@@ -11,68 +11,106 @@ from fastapi.responses import (
     Response
 )
 from pydantic import ValidationError
+from starlette.datastructures import QueryParams
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.compression import CompressionMiddleware
+from app.utils.request_timing import RequestTimingMiddleware
 
 
-class PaginationValidationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        page = int(request.query_params.get("page") or "1")
-        pageSize = int(request.query_params.get("pageSize") or "100")
+# The middlewares below are plain ASGI callables rather than
+# BaseHTTPMiddleware subclasses, which run every request through an extra
+# task and response stream per layer.
+
+
+def error_response(request: Request, content: str, status_code: int) -> Response:
+    return JSONResponse(
+        content={
+            "message": content.replace("\n", ": ").strip(),
+            "url": str(request.url),
+        },
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+class PaginationValidationMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["query_string"]:
+            error = self.__validate(QueryParams(scope["query_string"]))
+            if error:
+                response = error_response(
+                    Request(scope), error, status_code=status.HTTP_400_BAD_REQUEST
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+    def __validate(self, query_params: QueryParams):
+        try:
+            page = int(query_params.get("page") or "1")
+        except ValueError:
+            return "invalid page number"
         if page < 1 or page > 100000:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="invalid page number",
-            )
+            return "invalid page number"
+
+        try:
+            pageSize = int(query_params.get("pageSize") or "100")
+        except ValueError:
+            return "invalid page size"
         if pageSize < 1 or pageSize > 1000:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="invalid page size"
-            )
-        return await call_next(request)
+            return "invalid page size"
 
 
-class CORSMiddlewareLocal(BaseHTTPMiddleware):
-    def allow_cors(self, response: Response):
-        response.headers["Access-Control-Allow-Origin"] = "*"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "*"
-        response.headers["Access-Control-Allow-Headers"] = "*"
-        return response
+class GlobalErrorHandlerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-    async def dispatch(self, request, call_next):
-        if request.method == "OPTIONS":
-            response = Response()
-            self.allow_cors(response)
-            return response
-        response = await call_next(request)
-        return self.allow_cors(response)
+        response_started = False
 
+        async def send_tracking_start(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-class GlobalErrorHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response = ""
         try:
-            response = await call_next(request)
-        except HTTPException as e:
+            return await self.app(scope, receive, send_tracking_start)
+        except Exception as e:
+            # too late for an error body once the headers are out
+            if response_started:
+                raise
+            response = self.__handle_error(Request(scope), e)
+        await response(scope, receive, send)
+
+    def __handle_error(self, request: Request, error: Exception) -> Response:
+        if isinstance(error, HTTPException):
             response = self.__build_error_response(
-                request, e.detail, status_code=e.status_code
+                request, error.detail, status_code=error.status_code
             )
-        except JOSEError as e:
+        elif isinstance(error, JOSEError):
             response = self.__build_error_response(
                 request,
-                content="\n".join([str(arg) for arg in e.args]),
+                content="\n".join([str(arg) for arg in error.args]),
                 status_code=status.HTTP_401_UNAUTHORIZED,
             )
-        except ValidationError as e:
+        elif isinstance(error, ValidationError):
             response = self.__build_error_response(
                 request,
-                e.__str__(),
+                error.__str__(),
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-        except Exception as e:
+        else:
             response = self.__build_error_response(
                 request,
-                "\n".join([str(arg) for arg in e.args]),
+                "\n".join([str(arg) for arg in error.args]),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         return response
@@ -81,18 +119,17 @@ class GlobalErrorHandlerMiddleware(BaseHTTPMiddleware):
         traceback.print_exc()
         if hasattr(request.state, "db"):
             request.state.db.rollback()
-        return JSONResponse(
-            content={
-                "message": content.replace("\n", ": ").strip(),
-                "url": str(request.url),
-            },
-            status_code=status_code,
-            media_type="application/json",
-        )
+        return error_response(request, content, status_code)
 
 
 def setup_middlewares(app: FastAPI):
+    # each middleware added wraps the ones before it, so requests pass
+    # through them outermost first: timing -> compression -> CORS ->
+    # pagination -> error handler -> app
+    app.add_middleware(GlobalErrorHandlerMiddleware)
+    app.add_middleware(PaginationValidationMiddleware)
     # CORS middleware we are allowing api end points from any portal. because this api can be used with any portal as well as servers
+    # outside the error handler so error responses carry the CORS headers too
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -101,6 +138,13 @@ def setup_middlewares(app: FastAPI):
         allow_headers=["*"],  # ["Origin", "Content-Type","Authorization"],
         expose_headers=["*"],
     )
-    app.add_middleware(GlobalErrorHandlerMiddleware)
-    app.add_middleware(CORSMiddlewareLocal)
-    app.add_middleware(PaginationValidationMiddleware)
+    if settings.RESPONSE_COMPRESS_MIN_BYTES:
+        app.add_middleware(
+            CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESS_MIN_BYTES
+        )
+    app.add_middleware(
+        RequestTimingMiddleware,
+        sample_rate=settings.REQUEST_TIMING_LOG_SAMPLE_RATE,
+        slow_ms=settings.REQUEST_TIMING_SLOW_MS,
+        repeat_threshold=settings.SQL_REPEAT_WARN_THRESHOLD,
+    )
@@ -1,23 +1,255 @@
-from fastapi import Request, HTTPException, status
+import logging
+import time
+import uuid
+from typing import Optional
+
+from fastapi import Request, Response, HTTPException, status
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.utils.auth_dependencies import user_from_token
+from app.utils.constants import AUTHORIZATION
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import metrics
 from app.utils.redis_client import redis_client
 
 
-def rate_limiter(key_prefix: str, limit: int, window: int):
-    async def limiter(request: Request):
-        user = getattr(request.state, "user", None)
+logger = logging.getLogger("app.rate_limiter")
+
+
+# Sliding-window log: one sorted set per client, scored by request time in
+# ms (Redis server time, so workers' clocks don't matter). Trimming,
+# counting, admitting and expiring happen in one atomic script.
+# KEYS[1] log; ARGV[1] limit, ARGV[2] window ms, ARGV[3] unique member,
+# ARGV[4] requests this worker already admitted locally since its last sync
+# -> {allowed, remaining, ms until the oldest entry leaves the window}
+_sliding_window_script = redis_client.register_script(
+    """
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local synced = tonumber(ARGV[4] or "0")
+    local time = redis.call("TIME")
+    local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+    redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+    for i = 1, synced do
+        redis.call("ZADD", KEYS[1], now, ARGV[3] .. ":" .. i)
+    end
+    local count = redis.call("ZCARD", KEYS[1])
+    local allowed = 0
+    if count < limit then
+        redis.call("ZADD", KEYS[1], now, ARGV[3])
+        count = count + 1
+        allowed = 1
+    end
+    redis.call("PEXPIRE", KEYS[1], window)
+
+    local reset = window
+    local oldest = redis.call("ZRANGE", KEYS[1], 0, 0, "WITHSCORES")
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window - now
+    end
+    return {allowed, math.max(limit - count, 0), reset}
+    """
+)
+
+
+class _LocalBucket:
+    """
+    What this worker knows about one client: the tokens Redis had left at the
+    last sync, and the requests admitted locally since then.
+    """
+
+    __slots__ = ("remaining", "pending", "synced_at", "reset_at")
+
+    def __init__(self, remaining: int, reset_ms: int):
+        now = time.monotonic()
+        self.remaining = remaining
+        self.pending = 0
+        self.synced_at = now
+        self.reset_at = now + reset_ms / 1000
+
+    def take(self) -> bool:
+        """
+        Admit one request locally while the client is comfortably below its
+        limit and the last sync is recent; otherwise leave it to Redis.
+        """
+        batch = settings.RATE_LIMIT_LOCAL_BATCH
+        if (
+            self.pending < batch
+            and self.remaining - self.pending > batch
+            and time.monotonic() - self.synced_at < settings.RATE_LIMIT_SYNC_INTERVAL
+        ):
+            self.pending += 1
+            return True
+        return False
+
+    def hand_off(self) -> int:
+        """
+        The requests admitted locally since the last sync, now to be synced
+        by the caller; later local admissions start counting from zero.
+        """
+        synced, self.pending = self.pending, 0
+        return synced
+
+    def exhausted(self) -> bool:
+        """
+        Redis had no tokens left and none have left the window since.
+        """
+        return self.remaining <= 0 and time.monotonic() < self.reset_at
+
+    def reset_ms(self) -> int:
+        return max(0, int((self.reset_at - time.monotonic()) * 1000))
+
+
+_local_buckets = LRUCache(settings.RATE_LIMIT_LOCAL_SIZE)
+
+
+def _store_bucket(redis_key: str, remaining: int, reset_ms: int, window: int) -> _LocalBucket:
+    """
+    Replace the client's bucket with what Redis just reported. Requests the
+    old one admitted while Redis was being asked carry over, to be synced on
+    the next check.
+    """
+    bucket = _LocalBucket(remaining, reset_ms)
+    current = _local_buckets.get(redis_key)
+    if current is not None:
+        bucket.pending = current.hand_off()
+    # a bucket only admits locally for RATE_LIMIT_SYNC_INTERVAL after a sync,
+    # so by the time it expires everything it never synced has left the
+    # window in Redis as well
+    _local_buckets.set(
+        redis_key, bucket, ttl=window + settings.RATE_LIMIT_SYNC_INTERVAL
+    )
+    return bucket
 
-        identifier = user.id if user else request.client.host
-        redis_key = f"rate:{key_prefix}:{identifier}"
+_local_hits = metrics.counter("ratelimit.local_hits")
+_redis_checks = metrics.counter("ratelimit.redis_checks")
+_redis_errors = metrics.counter("ratelimit.redis_errors")
+_rejected = metrics.counter("ratelimit.rejected")
 
-        current = await redis_client.incr(redis_key)
 
-        if current == 1:
-            await redis_client.expire(redis_key, window)
+def rate_limit_headers(limit: int, remaining: int, reset_ms: int) -> dict:
+    reset = max(1, -(-reset_ms // 1000))
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(max(remaining, 0)),
+        "X-RateLimit-Reset": str(reset),
+    }
 
-        if current > limit:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many requests. Please try again later.",
+
+def client_ip(request: Request) -> str:
+    """
+    The client's address, read through RATE_LIMIT_TRUSTED_PROXY_HOPS proxies'
+    X-Forwarded-For entries. Entries further left are client-supplied and
+    ignored.
+    """
+    peer = request.client.host if request.client else "unknown"
+    hops = settings.RATE_LIMIT_TRUSTED_PROXY_HOPS
+    if hops <= 0:
+        return peer
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    chain = [address.strip() for address in forwarded.split(",") if address.strip()]
+    chain.append(peer)
+    return chain[max(len(chain) - 1 - hops, 0)]
+
+
+def client_identity(request: Request) -> tuple[str, Optional[str]]:
+    """
+    (bucket identifier, role) for the caller: the signed-in user when the
+    request carries a valid token, whether or not auth has run yet, and the
+    client address otherwise.
+    """
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = user_from_token(request.headers.get(AUTHORIZATION) or "")
+    if user is not None:
+        return f"user:{user.id}", user.role
+    return f"ip:{client_ip(request)}", None
+
+
+def quota_for(key_prefix: str, limit: int, role: Optional[str]) -> int:
+    limit = settings.RATE_LIMIT_ROUTE_QUOTAS.get(key_prefix, limit)
+    if role is not None:
+        limit = int(limit * settings.RATE_LIMIT_ROLE_QUOTAS.get(role, 1))
+    return max(limit, 1)
+
+
+def _too_many_requests(headers: dict) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Please try again later.",
+        headers={**headers, "Retry-After": headers["X-RateLimit-Reset"]},
+    )
+
+
+async def _check_in_redis(
+    redis_key: str, limit: int, window: int, synced: int
+) -> tuple[int, int, int]:
+    _redis_checks.inc()
+    try:
+        return await _sliding_window_script(
+            keys=[redis_key],
+            args=[limit, window * 1000, uuid.uuid4().hex, synced],
+        )
+    except RedisError:
+        _redis_errors.inc()
+        if settings.RATE_LIMIT_FAIL_OPEN:
+            logger.warning("rate limit check for %s skipped: Redis unavailable", redis_key)
+            return 1, limit, window * 1000
+        logger.exception("rate limit check for %s failed: Redis unavailable", redis_key)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service temporarily unavailable. Please try again later.",
+        )
+
+
+def rate_limiter(key_prefix: str, limit: int, window: int):
+    """
+    Allow `limit` requests per client in any `window` seconds, after the
+    route and role overrides in RATE_LIMIT_ROUTE_QUOTAS and
+    RATE_LIMIT_ROLE_QUOTAS.
+
+    Redis holds the authoritative sliding window; each worker absorbs checks
+    for clients well below their limit in a local bucket and syncs what it
+    admitted on the next Redis check. A single worker never admits past the
+    limit, but workers don't see each other's unsynced requests: with N
+    workers a client can get up to about N * RATE_LIMIT_LOCAL_BATCH requests
+    over its limit.
+    """
+
+    async def limiter(request: Request, response: Response):
+        identifier, role = client_identity(request)
+        quota = quota_for(key_prefix, limit, role)
+        redis_key = f"ratelimit:{key_prefix}:{identifier}"
+
+        bucket = _local_buckets.get(redis_key)
+        if bucket is not None and bucket.exhausted():
+            _rejected.inc()
+            raise _too_many_requests(rate_limit_headers(quota, 0, bucket.reset_ms()))
+        if bucket is not None and bucket.take():
+            _local_hits.inc()
+            response.headers.update(
+                rate_limit_headers(
+                    quota, bucket.remaining - bucket.pending, bucket.reset_ms()
+                )
             )
+            return
+
+        # hand the locally admitted requests over before awaiting, so
+        # concurrent checks on this worker don't sync them twice
+        synced = bucket.hand_off() if bucket is not None else 0
+
+        allowed, remaining, reset_ms = await _check_in_redis(
+            redis_key, quota, window, synced
+        )
+        _store_bucket(redis_key, remaining, reset_ms, window)
+        headers = rate_limit_headers(quota, remaining, reset_ms)
+
+        if not allowed:
+            _rejected.inc()
+            raise _too_many_requests(headers)
+        response.headers.update(headers)
 
     return limiter
@@ -4,3 +4,8 @@ from app.config import settings  # or env
 redis_client = redis.Redis(
     host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0, decode_responses=True
 )
+
+# for cached payloads, which are read back as raw bytes
+redis_binary_client = redis.Redis(
+    host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0
+)
@@ -0,0 +1,233 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger("app.request_timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class RequestTiming:
+    """
+    Database timings collected for the request running in the current context.
+    """
+
+    __slots__ = (
+        "started",
+        "statements",
+        "sql_seconds",
+        "commit_seconds",
+        "db_session_seconds",
+        "statement_shapes",
+        "_open_sessions",
+        "_session_opened",
+    )
+
+    def __init__(self, track_statements: bool = False):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.commit_seconds = 0.0
+        self.db_session_seconds = 0.0
+        # statement text -> executions; only kept when repeat warnings are on
+        self.statement_shapes: Optional[Counter] = (
+            Counter() if track_statements else None
+        )
+        self._open_sessions = 0
+        self._session_opened = 0.0
+
+    def open_db_session(self) -> None:
+        if not self._open_sessions:
+            self._session_opened = time.perf_counter()
+        self._open_sessions += 1
+
+    def close_db_session(self) -> None:
+        self._open_sessions -= 1
+        if not self._open_sessions:
+            self.db_session_seconds += time.perf_counter() - self._session_opened
+
+    @property
+    def db_session_elapsed(self) -> float:
+        """
+        Session lifetime so far; sessions from `Depends` are still open when
+        the response headers go out.
+        """
+        if self._open_sessions:
+            return self.db_session_seconds + time.perf_counter() - self._session_opened
+        return self.db_session_seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            [
+                'sql;desc="%d statements";dur=%.2f'
+                % (self.statements, self.sql_seconds * 1000),
+                "commit;dur=%.2f" % (self.commit_seconds * 1000),
+                "db_session;dur=%.2f" % (self.db_session_elapsed * 1000),
+                "total;dur=%.2f" % (self.elapsed * 1000),
+            ]
+        )
+
+
+current_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "current_request_timing", default=None
+)
+
+
+# ---------------- SQLALCHEMY EVENTS ----------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request_timing.get() is not None:
+        context._request_timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = current_request_timing.get()
+    start = getattr(context, "_request_timing_start", None)
+    if timing is not None and start is not None:
+        timing.statements += 1
+        timing.sql_seconds += time.perf_counter() - start
+        if timing.statement_shapes is not None:
+            timing.statement_shapes[statement] += 1
+
+
+def instrument_engine(sync_engine: sa.Engine) -> None:
+    sa.event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    sa.event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def count_queries(*sync_engines: sa.Engine) -> Iterator[List[str]]:
+    """
+    Collect every statement sent through the given engines while the block
+    runs, regardless of which request or thread issued it. Meant for tests.
+    """
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for sync_engine in sync_engines:
+        sa.event.listen(sync_engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        for sync_engine in sync_engines:
+            sa.event.remove(sync_engine, "before_cursor_execute", _record)
+
+
+@sa.event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    if current_request_timing.get() is not None:
+        session.info["_request_timing_commit"] = time.perf_counter()
+
+
+@sa.event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    timing = current_request_timing.get()
+    start = session.info.pop("_request_timing_commit", None)
+    if timing is not None and start is not None:
+        timing.commit_seconds += time.perf_counter() - start
+
+
+# ---------------- MIDDLEWARE ----------------
+class RequestTimingMiddleware:
+    """
+    Opens a timing context per HTTP request, reports it in a `Server-Timing`
+    header and logs a sampled JSON line once the request has fully finished.
+
+    Written as a plain ASGI middleware so the log line is emitted after the
+    `Depends` sessions are closed, which happens after the response is sent.
+
+    With `repeat_threshold` set, a warning is logged whenever one request runs
+    the same statement more than that many times, the usual sign of an N+1.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float,
+        slow_ms: float,
+        repeat_threshold: int = 0,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timing = RequestTiming(track_statements=self.repeat_threshold > 0)
+        token = current_request_timing.set(timing)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", timing.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_timing.reset(token)
+            self._log(scope, status_code, timing)
+            if timing.statement_shapes:
+                self._warn_repeated_statements(scope, timing)
+
+    def _log(self, scope: Scope, status_code: int, timing: RequestTiming) -> None:
+        elapsed_ms = timing.elapsed * 1000
+        if elapsed_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_timing",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "total_ms": round(elapsed_ms, 2),
+                    "db_session_ms": round(timing.db_session_seconds * 1000, 2),
+                    "sql_statements": timing.statements,
+                    "sql_ms": round(timing.sql_seconds * 1000, 2),
+                    "commit_ms": round(timing.commit_seconds * 1000, 2),
+                }
+            )
+        )
+
+    def _warn_repeated_statements(self, scope: Scope, timing: RequestTiming) -> None:
+        for statement, count in timing.statement_shapes.items():
+            if count > self.repeat_threshold:
+                logger.warning(
+                    json.dumps(
+                        {
+                            "event": "repeated_statement",
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "count": count,
+                            "statement": " ".join(statement.split())[:500],
+                        }
+                    )
+                )
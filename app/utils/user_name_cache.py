@@ -0,0 +1,147 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.utils.cache import CACHE_GENERATION_KEY, add_cache_tags
+from app.utils.db_queries import get_user_names_by_ids
+from app.utils.lru_cache import LRUCache
+from app.utils.redis_client import redis_client
+
+
+# v2: values carry the generation they were read under
+USER_NAME_CACHE_KEY = "cache:user_name:v2:{}"
+
+# Names are cached along with the generation of their `user:{id}` tag and
+# only served while it is current, so `invalidate_tags` on that tag retires
+# them in every worker at once. Redis values are b"<generation>|<name>".
+
+# KEYS generation keys, then name keys; ARGV the generation of each id's
+# local entry, "" for none -> {generation, name or false} per id, the name
+# only when the local entry is out of date
+_lookup_script = redis_client.register_script(
+    """
+    local n = #ARGV
+    local found = {}
+    for i = 1, n do
+        local generation = redis.call("GET", KEYS[i]) or "0"
+        local name = false
+        if ARGV[i] ~= generation then
+            local raw = redis.call("GET", KEYS[n + i])
+            local prefix = generation .. "|"
+            if raw and string.sub(raw, 1, #prefix) == prefix then
+                name = string.sub(raw, #prefix + 1)
+            end
+        end
+        found[2 * i - 1] = generation
+        found[2 * i] = name
+    end
+    return found
+    """
+)
+
+# KEYS generation keys, then name keys; ARGV[1] expiry, then the generation
+# each name was read under and the names. A name whose generation moved on
+# while it was read from the database is not stored.
+_store_script = redis_client.register_script(
+    """
+    local n = #KEYS / 2
+    for i = 1, n do
+        local generation = ARGV[1 + i]
+        if (redis.call("GET", KEYS[i]) or "0") == generation then
+            redis.call(
+                "SET", KEYS[n + i], generation .. "|" .. ARGV[1 + n + i],
+                "EX", ARGV[1]
+            )
+        end
+    end
+    return 0
+    """
+)
+
+
+class UserNameResolver:
+    """
+    Resolves user ids to names through an in-process LRU, then Redis, then a
+    single `IN` query for whatever is still missing. Every lookup checks the
+    ids' `user:{id}` generations in Redis, so a rename followed by
+    `invalidate_tags(f"user:{id}")` is seen by all workers straight away.
+    """
+
+    def __init__(self, local_cache: LRUCache, expiry: int):
+        self.local_cache = local_cache
+        self.expiry = expiry
+
+    @staticmethod
+    def _cache_key(user_id: int) -> str:
+        return USER_NAME_CACHE_KEY.format(user_id)
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return CACHE_GENERATION_KEY.format(f"user:{user_id}")
+
+    async def get_many(
+        self, db: AsyncSession, user_ids: Iterable[Optional[int]]
+    ) -> Dict[int, str]:
+        ids = sorted({user_id for user_id in user_ids if user_id is not None})
+        if not ids:
+            return {}
+        # responses cached around this call embed the names
+        add_cache_tags(*(f"user:{user_id}" for user_id in ids))
+
+        local = self.local_cache.get_many(ids)
+        found = await _lookup_script(
+            keys=[
+                *(self._generation_key(user_id) for user_id in ids),
+                *(self._cache_key(user_id) for user_id in ids),
+            ],
+            args=[local[user_id][0] if user_id in local else "" for user_id in ids],
+        )
+
+        names: Dict[int, str] = {}
+        generations: Dict[int, str] = {}
+        for user_id, generation, name in zip(ids, found[::2], found[1::2]):
+            if user_id in local and local[user_id][0] == generation:
+                names[user_id] = local[user_id][1]
+            elif name is not None:
+                names[user_id] = name
+                self.local_cache.set(user_id, (generation, name))
+            else:
+                generations[user_id] = generation
+
+        if not generations:
+            return names
+
+        rows = await get_user_names_by_ids(db, list(generations))
+        fetched = {row.id: row.name for row in rows}
+        if fetched:
+            await _store_script(
+                keys=[
+                    *(self._generation_key(user_id) for user_id in fetched),
+                    *(self._cache_key(user_id) for user_id in fetched),
+                ],
+                args=[
+                    self.expiry,
+                    *(generations[user_id] for user_id in fetched),
+                    *fetched.values(),
+                ],
+            )
+            # the generation read before the query; a rename since then has
+            # moved it on and this entry is never served
+            for user_id, name in fetched.items():
+                self.local_cache.set(user_id, (generations[user_id], name))
+
+        names.update(fetched)
+        return names
+
+    async def get(self, db: AsyncSession, user_id: Optional[int]) -> Optional[str]:
+        return (await self.get_many(db, [user_id])).get(user_id)
+
+
+user_name_resolver = UserNameResolver(
+    local_cache=LRUCache(
+        maxsize=settings.USER_NAME_LOCAL_CACHE_SIZE,
+        ttl=settings.USER_NAME_LOCAL_CACHE_TTL,
+    ),
+    expiry=settings.CACHE_EXPIRY_USER_NAME,
+)
@@ -0,0 +1,94 @@
+"""
+Cost per request of the bearer-token check on protected routes.
+
+Calls `verify_auth_token` the way FastAPI does for every protected request,
+with a valid and with a forged token, once with the verified-token caches
+emptied before each call (a full decode and signature check, as before the
+caches) and once with them warm, and prints the mean and p95 per call.
+
+    python -m benchmarks.auth_benchmark --repeat 20000
+
+Needs only JWT_SECRET and the other settings from the environment.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from jose import jwt
+from starlette.requests import Request
+
+from app.utils import auth_dependencies
+from app.utils.auth_dependencies import ALGORITHM, SECRET_KEY, verify_auth_token
+
+
+def make_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/batches",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "state": {},
+        }
+    )
+
+
+def make_tokens() -> tuple[str, str]:
+    claims = {
+        "id": 1,
+        "name": "bench",
+        "email": "bench@example.org",
+        "role": "Admin",
+        "phone_number": "9000000000",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    valid = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    forged = jwt.encode(claims, SECRET_KEY + "-forged", algorithm=ALGORITHM)
+    return valid, forged
+
+
+def clear_caches() -> None:
+    auth_dependencies._verified_tokens.clear()
+    auth_dependencies._rejected_tokens.clear()
+
+
+async def measure(token: str, repeat: int, cold: bool) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        request = make_request(token)
+        start = time.perf_counter()
+        try:
+            await verify_auth_token(request)
+        except HTTPException:
+            pass
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+async def run(repeat: int) -> None:
+    valid, forged = make_tokens()
+    for label, token in (("valid", valid), ("forged", forged)):
+        for mode, cold in (("uncached", True), ("cached", False)):
+            clear_caches()
+            timings = sorted(await measure(token, repeat, cold))
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(
+                f"{label:<7} {mode:<9} mean={statistics.fmean(timings):8.2f}us "
+                f"p95={p95:8.2f}us"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Size, Redis memory and hit latency of cached payloads, plain and compressed.
+
+Builds student-list payloads shaped like the cached `/students` response for
+a few list lengths, stores each under a scratch key the way the cache layer
+would (plain, or gzip behind the marker byte) and reads it back repeatedly.
+
+    python -m benchmarks.cache_compression_benchmark --rows 100 1000 10000
+
+Uses the REDIS_* settings from the environment; the scratch keys are deleted
+afterwards. MEMORY USAGE is reported as n/a where the server lacks it.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+import orjson
+import redis
+
+from app.config import settings
+from app.utils.cache import GZIP_MARKER, decompress_payload
+from app.utils.compression import gzip_compress
+
+
+KEY = "bench:cache_compression"
+MODES = (("plain", None), ("gzip-1", 1), ("gzip-6", 6))
+
+
+def build_payload(rows: int) -> bytes:
+    now = datetime.now().isoformat()
+    students = [
+        {
+            "id": i,
+            "name": f"student {i}",
+            "email": f"student{i}@example.org",
+            "phone_number": f"{9000000000 + i}",
+            "degree": ("B.Tech", "B.Sc", "MCA")[i % 3],
+            "specialization": ("CSE", "ECE", "IT", "Maths")[i % 4],
+            "passout_year": 2018 + i % 7,
+            "city": ("Hyderabad", "Chennai", "Pune")[i % 3],
+            "state": ("Telangana", "Tamil Nadu", "Maharashtra")[i % 3],
+            "referral_by": "mentor %d" % (i % 20),
+            "created_at": now,
+            "created_by": "superadmin",
+            "updated_at": now,
+            "updated_by": "superadmin",
+            "is_active": True,
+        }
+        for i in range(rows)
+    ]
+    return orjson.dumps(
+        {"status_message": "SUCCESS", "page_size": rows, "data": students}
+    )
+
+
+def encode(payload: bytes, level) -> bytes:
+    if level is None:
+        return payload
+    return GZIP_MARKER + gzip_compress(payload, level)
+
+
+def memory_usage(client: redis.Redis) -> str:
+    try:
+        return "%dB" % client.memory_usage(KEY)
+    except redis.ResponseError:
+        return "n/a"
+
+
+def measure(client: redis.Redis, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decompress_payload(client.get(KEY))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+    try:
+        for rows in args.rows:
+            payload = build_payload(rows)
+            for label, level in MODES:
+                start = time.perf_counter()
+                stored = encode(payload, level)
+                encode_ms = (time.perf_counter() - start) * 1000
+                client.set(KEY, stored)
+
+                ordered = sorted(measure(client, args.repeat))
+                p95 = ordered[int(len(ordered) * 0.95) - 1]
+                print(
+                    f"rows={rows:<6} {label:<7} size={len(stored):>9}B "
+                    f"memory={memory_usage(client):>10} encode={encode_ms:7.2f}ms "
+                    f"hit p50={statistics.median(ordered):6.3f}ms p95={p95:6.3f}ms"
+                )
+    finally:
+        client.delete(KEY)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Requests per second through the middleware stack on a trivial endpoint.
+
+Serves the same `GET /ping` from three apps: no middleware, the previous
+stack of BaseHTTPMiddleware layers (reproduced below, pass-through apart
+from the CORS headers) in front of Starlette's CORSMiddleware, and the
+current `setup_middlewares` stack. Requests go in-process through httpx's
+ASGI transport, so only app and middleware time is measured.
+
+    python -m benchmarks.middleware_benchmark --requests 5000 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+
+from app.config import settings
+from app.utils.middlewares import setup_middlewares
+from app.utils.request_timing import RequestTimingMiddleware
+
+
+class LegacyPaginationValidationMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        int(request.query_params.get("page") or "1")
+        int(request.query_params.get("pageSize") or "100")
+        return await call_next(request)
+
+
+class LegacyCORSMiddlewareLocal(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Access-Control-Allow-Methods"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "*"
+        return response
+
+
+class LegacyGlobalErrorHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return Response(b'{"status_message":"SUCCESS"}', media_type="application/json")
+
+    return app
+
+
+def bare_app() -> FastAPI:
+    return build_app()
+
+
+def legacy_app() -> FastAPI:
+    app = build_app()
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+    app.add_middleware(LegacyGlobalErrorHandlerMiddleware)
+    app.add_middleware(LegacyCORSMiddlewareLocal)
+    app.add_middleware(LegacyPaginationValidationMiddleware)
+    app.add_middleware(
+        RequestTimingMiddleware,
+        sample_rate=settings.REQUEST_TIMING_LOG_SAMPLE_RATE,
+        slow_ms=settings.REQUEST_TIMING_SLOW_MS,
+    )
+    return app
+
+
+def current_app() -> FastAPI:
+    app = build_app()
+    setup_middlewares(app)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> tuple[float, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    timings = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter(range(requests))
+
+        async def worker():
+            for _ in queue:
+                start = time.perf_counter()
+                response = await client.get("/ping", headers={"Origin": "http://bench"})
+                timings.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200
+
+        for _ in range(concurrency * 5):  # warm-up
+            await client.get("/ping")
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start), timings
+
+
+async def run(args) -> None:
+    for label, factory in (
+        ("bare", bare_app),
+        ("legacy", legacy_app),
+        ("current", current_app),
+    ):
+        rps, timings = await measure(factory(), args.requests, args.concurrency)
+        ordered = sorted(timings)
+        p95 = ordered[int(len(ordered) * 0.95) - 1]
+        print(
+            f"{label:<8} {rps:9.0f} req/s  p50={statistics.median(ordered):6.3f}ms "
+            f"p95={p95:6.3f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # keep the timing middleware from logging during the run
+    settings.REQUEST_TIMING_LOG_SAMPLE_RATE = 0
+    settings.REQUEST_TIMING_SLOW_MS = 10**9
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
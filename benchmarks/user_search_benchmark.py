@@ -0,0 +1,130 @@
+"""
+Latency of the admin user search with and without the pg_trgm GIN indexes.
+
+Seeds a scratch schema with synthetic users, runs the same ranked
+`ilike` search UserService issues, once on the bare table and once after
+adding the trigram indexes, and prints p50/p95/max per phase.
+
+    python -m benchmarks.user_search_benchmark --rows 100000
+
+Uses the POSTGRES_* settings from the environment; the database needs the
+pg_trgm extension available. The scratch schema is dropped afterwards.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.connectors.database_connector import engine
+
+
+SCHEMA = "bench_user_search"
+SEARCH_TERMS = ("alice", "smith", "9876", "example.org", "zz_no_match")
+
+SEARCH_QUERY = text(
+    f"""
+    SELECT id, name, email, phone_number,
+           greatest(similarity(name, :term), similarity(email, :term),
+                    similarity(phone_number, :term)) AS search_rank
+    FROM {SCHEMA}.users
+    WHERE name ILIKE :pattern OR email ILIKE :pattern OR phone_number ILIKE :pattern
+    ORDER BY search_rank DESC, id DESC
+    LIMIT :limit
+    """
+)
+
+
+def seed(connection, rows: int) -> None:
+    connection.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA "{SCHEMA}"'))
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    connection.execute(
+        text(
+            f"""
+            CREATE TABLE {SCHEMA}.users (
+                id serial PRIMARY KEY,
+                name varchar(50) NOT NULL,
+                email varchar(100) NOT NULL,
+                phone_number varchar(20) NOT NULL
+            )
+            """
+        )
+    )
+    connection.execute(
+        text(
+            f"""
+            INSERT INTO {SCHEMA}.users (name, email, phone_number)
+            SELECT (ARRAY['alice', 'bob', 'carol', 'dave', 'erin', 'frank'])[1 + i % 6]
+                       || ' ' || (ARRAY['smith', 'jones', 'brown', 'taylor'])[1 + i % 4]
+                       || ' ' || substr(md5(i::text), 1, 6),
+                   substr(md5(i::text), 1, 10) || '@'
+                       || (ARRAY['example.org', 'mail.com', 'corp.net'])[1 + i % 3],
+                   lpad((9000000000 + i)::text, 10, '0')
+            FROM generate_series(1, :rows) AS i
+            """
+        ),
+        {"rows": rows},
+    )
+    connection.execute(text(f"ANALYZE {SCHEMA}.users"))
+
+
+def add_trigram_indexes(connection) -> None:
+    for column in ("name", "email", "phone_number"):
+        connection.execute(
+            text(
+                f"CREATE INDEX ix_users_{column}_trgm ON {SCHEMA}.users "
+                f"USING gin ({column} gin_trgm_ops)"
+            )
+        )
+    connection.execute(text(f"ANALYZE {SCHEMA}.users"))
+
+
+def measure(connection, repeat: int, page_size: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        for term in SEARCH_TERMS:
+            start = time.perf_counter()
+            connection.execute(
+                SEARCH_QUERY,
+                {"term": term, "pattern": f"%{term}%", "limit": page_size + 1},
+            ).all()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<16} n={len(ordered):<5} p50={statistics.median(ordered):8.2f}ms "
+        f"p95={p95:8.2f}ms max={ordered[-1]:8.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=10)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        try:
+            print(f"seeding {args.rows} users into {SCHEMA} ...")
+            seed(connection, args.rows)
+            connection.commit()
+
+            report("sequential scan", measure(connection, args.repeat, args.page_size))
+
+            add_trigram_indexes(connection)
+            connection.commit()
+            report("gin_trgm_ops", measure(connection, args.repeat, args.page_size))
+        finally:
+            connection.rollback()
+            connection.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE'))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""add user search trgm indexes
+
+Revision ID: fec0b09d5ed8
+Revises: b306b4ad9754
+Create Date: 2026-10-18 11:02:37.512904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fec0b09d5ed8'
+down_revision = 'b306b4ad9754'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = ('name', 'email', 'phone_number')
+
+
+def upgrade() -> None:
+    # GIN trigram indexes serve the `ilike '%term%'` user search and the
+    # similarity() ranking; without them every keystroke scans the table
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_users_{column}_trgm',
+            'users',
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
+    # the extension is left installed; other schemas may rely on it
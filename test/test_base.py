@@ -4,6 +4,8 @@ from app.models.auth_models import (
     LoginResponse
 )
 from app.main import app
+from app.connectors.database_connector import async_engine, engine
+from app.utils.request_timing import count_queries
 class TestBase:
     client: TestClient
     superadmin_user_credentials = LoginRequest(email="superadmin@unittest.com",password="superadminPasswd")
@@ -30,6 +32,18 @@ class TestBase:
         return self.client
 
 
+    def assert_query_budget(self, method, url, max_queries, **kwargs):
+        with count_queries(engine, async_engine.sync_engine) as statements:
+            response = self.client.request(method, url, **kwargs)
+        # raise_for_status also rejects 304 Not Modified
+        if response.is_error:
+            response.raise_for_status()
+        assert len(statements) <= max_queries, "%s %s ran %d statements (budget %d):\n%s" % (
+            method, url, len(statements), max_queries, "\n".join(statements)
+        )
+        return response
+
+
     def setup_class(self):
         self.client = TestClient(app)
         self.login_as_super_admin(self)
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.utils.cache import (
+    CacheNamespace,
+    JsonSerializer,
+    add_cache_tags,
+    get_namespace,
+    invalidate_tags,
+)
+from app.utils.redis_client import redis_binary_client, redis_client
+
+
+class TestCacheInvalidation:
+    """
+    A rebuild that reads rows before a write commits must not store them
+    after the write's invalidation, or the old rows outlive it.
+    """
+
+    key = "cache:test:invalidation"
+
+    def run(self, scenario):
+        # redis connections are bound to the event loop that opened them
+        redis_client.connection_pool.reset()
+        redis_binary_client.connection_pool.reset()
+        return asyncio.run(scenario)
+
+    async def load_around(self, invalidate, tags, added_tags=()):
+        namespace = CacheNamespace("test", 16, 5, 60, 1)
+        await redis_client.delete(self.key)
+        loading, written = asyncio.Event(), asyncio.Event()
+
+        async def load():
+            add_cache_tags(*added_tags)
+            loading.set()
+            await written.wait()
+            return {"rows": "read before the write"}
+
+        store = asyncio.create_task(
+            namespace.load_and_store(self.key, load, 60, JsonSerializer(), tags)
+        )
+        await loading.wait()
+        if invalidate:
+            await invalidate_tags(*invalidate)
+        written.set()
+        value = await store
+
+        stored = await redis_binary_client.get(self.key)
+        await redis_client.delete(self.key)
+        return value, stored, namespace.local.get(self.key)
+
+    def test_load_without_invalidation_is_stored(self):
+        value, stored, local = self.run(self.load_around(None, ["test:rows"]))
+        assert stored is not None
+        assert local == value
+
+    def test_load_racing_invalidation_is_not_stored(self):
+        value, stored, local = self.run(self.load_around(["test:rows"], ["test:rows"]))
+        assert value == {"rows": "read before the write"}
+        assert stored is None
+        assert local is None
+
+    def test_load_racing_invalidation_of_tag_added_while_loading(self):
+        value, stored, local = self.run(
+            self.load_around(["test:user"], ["test:rows"], added_tags=["test:user"])
+        )
+        assert stored is None
+        assert local is None
+
+    def test_invalidation_stops_callers_joining_an_earlier_load(self):
+        async def scenario():
+            namespace = get_namespace("test")
+            await redis_client.delete(self.key)
+            loading, written = asyncio.Event(), asyncio.Event()
+
+            async def load():
+                loading.set()
+                await written.wait()
+                return {"rows": "read before the write"}
+
+            first = asyncio.create_task(
+                namespace.get_or_load(self.key, load, 60, JsonSerializer(), ["test:rows"])
+            )
+            await loading.wait()
+            joinable = self.key in namespace.pending
+            await invalidate_tags("test:rows")
+            still_joinable = self.key in namespace.pending
+            written.set()
+            await first
+            await redis_client.delete(self.key)
+            return joinable, still_joinable
+
+        joinable, still_joinable = self.run(scenario())
+        assert joinable
+        assert not still_joinable
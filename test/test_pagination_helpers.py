@@ -0,0 +1,132 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.requests import Request
+
+from app.entities.batch import Batch
+from app.entities.user import User
+from app.utils.constants import INVALID_CURSOR
+from app.utils.helpers import (
+    apply_keyset_pagination,
+    cursor_scope,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    split_keyset_page,
+)
+
+
+def make_request(if_none_match=None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestCursor:
+    def assert_invalid(self, cursor, scope="updated_at"):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(cursor, scope)
+        assert error.value.status_code == 400
+        assert error.value.detail == INVALID_CURSOR
+
+    def test_cursor_round_trips_its_values(self):
+        values = [datetime(2024, 5, 1, 12, 30), 42]
+        cursor = encode_cursor("updated_at", values)
+        assert decode_cursor(cursor, "updated_at") == values
+
+    def test_tampered_payload_is_rejected(self):
+        payload, signature = encode_cursor("updated_at", ["a", 1]).split(".")
+        forged, _ = encode_cursor("updated_at", ["a", 1000]).split(".")
+        assert forged != payload
+        self.assert_invalid(f"{forged}.{signature}")
+
+    def test_cursor_for_another_scope_is_rejected(self):
+        self.assert_invalid(encode_cursor("name", ["a", 1]))
+
+    @pytest.mark.parametrize("cursor", ["", "no-separator", "a.b.c", "%%%.@@@", "abcde.fg"])
+    def test_malformed_cursor_is_rejected(self, cursor):
+        self.assert_invalid(cursor)
+
+
+class TestSplitKeysetPage:
+    rows = [SimpleNamespace(id=i, name=f"user {i}") for i in range(1, 5)]
+    by_name = cursor_scope(User.name, User.id, "asc")
+
+    def test_short_page_has_no_next_cursor(self):
+        page, cursor = split_keyset_page(self.rows[:3], 3, User.name, User.id, "asc")
+        assert page == self.rows[:3]
+        assert cursor is None
+
+    def test_extra_row_is_trimmed_and_points_the_cursor_at_the_last_row(self):
+        page, cursor = split_keyset_page(self.rows, 3, User.name, User.id, "asc")
+        assert page == self.rows[:3]
+        assert decode_cursor(cursor, self.by_name) == ["user 3", 3]
+
+    def test_sorting_by_id_alone_keys_the_cursor_on_id(self):
+        page, cursor = split_keyset_page(self.rows, 2, User.id, User.id, "asc")
+        assert decode_cursor(cursor, cursor_scope(User.id, User.id, "asc")) == [2]
+
+    def test_entity_is_picked_out_of_result_rows(self):
+        rows = [(row,) for row in self.rows]
+        page, cursor = split_keyset_page(
+            rows, 3, User.name, User.id, "asc", get_entity=lambda row: row[0]
+        )
+        assert page == rows[:3]
+        assert decode_cursor(cursor, self.by_name) == ["user 3", 3]
+
+
+class TestKeysetCursorScope:
+    rows = [SimpleNamespace(id=i, name=f"user {i}") for i in range(1, 5)]
+
+    def next_cursor(self, sort_column, order_by, params=()):
+        _, cursor = split_keyset_page(
+            self.rows, 2, sort_column, User.id, order_by, params=params
+        )
+        return cursor
+
+    def paginate(self, cursor, sort_column, id_column, order_by, params=()):
+        return apply_keyset_pagination(
+            select(User), sort_column, id_column, order_by, cursor, 2, params
+        )
+
+    def assert_rejected(self, cursor, sort_column, id_column, order_by, params=()):
+        with pytest.raises(HTTPException) as error:
+            self.paginate(cursor, sort_column, id_column, order_by, params)
+        assert error.value.detail == INVALID_CURSOR
+
+    def test_cursor_continues_the_listing_it_came_from(self):
+        cursor = self.next_cursor(User.name, "asc", ["ann", None, None])
+        self.paginate(cursor, User.name, User.id, "asc", ["ann", None, None])
+
+    def test_cursor_for_the_other_direction_is_rejected(self):
+        cursor = self.next_cursor(User.name, "asc")
+        self.assert_rejected(cursor, User.name, User.id, "desc")
+
+    def test_cursor_for_other_search_or_filters_is_rejected(self):
+        cursor = self.next_cursor(User.name, "asc", ["ann", None, None])
+        self.assert_rejected(cursor, User.name, User.id, "asc", ["bob", None, None])
+        self.assert_rejected(cursor, User.name, User.id, "asc", ["ann", "role", "Admin"])
+
+    def test_cursor_for_another_listing_is_rejected(self):
+        cursor = self.next_cursor(User.id, "asc")
+        self.assert_rejected(cursor, Batch.id, Batch.id, "asc")
+
+
+class TestEtagMatches:
+    def test_missing_header_does_not_match(self):
+        assert not etag_matches(make_request(), '"abc"')
+
+    def test_matching_and_listed_tags_match(self):
+        assert etag_matches(make_request('"abc"'), '"abc"')
+        assert etag_matches(make_request('"xyz", "abc"'), '"abc"')
+        assert etag_matches(make_request("*"), '"abc"')
+
+    def test_weak_and_strong_forms_compare_equal(self):
+        assert etag_matches(make_request('W/"abc"'), '"abc"')
+        assert etag_matches(make_request('"abc"'), 'W/"abc"')
+
+    def test_other_tags_do_not_match(self):
+        assert not etag_matches(make_request('"abd"'), '"abc"')
+        assert not etag_matches(make_request('W/"abd"'), 'W/"abc"')
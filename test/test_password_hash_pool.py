@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from app.utils.hasher import PasswordHashPool
+
+
+class TestPasswordHashPool:
+    def test_cancelled_caller_counts_until_the_job_finishes(self):
+        pool = PasswordHashPool(workers=1, max_pending=4)
+
+        async def scenario():
+            caller = asyncio.create_task(pool._run(time.sleep, 0.2))
+            await asyncio.sleep(0.05)
+            caller.cancel()
+            await asyncio.sleep(0.05)
+            while_running = pool.pending
+            await asyncio.sleep(0.3)
+            return while_running, pool.pending
+
+        while_running, after = asyncio.run(scenario())
+        assert while_running == 1
+        assert after == 0
+
+    def test_pending_drops_once_the_job_returns(self):
+        pool = PasswordHashPool(workers=1, max_pending=4)
+
+        async def scenario():
+            result = await pool._run(lambda: "hashed")
+            # the count is released on the loop right after the job
+            await asyncio.sleep(0)
+            return result, pool.pending
+
+        assert asyncio.run(scenario()) == ("hashed", 0)
@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.config import settings
+from app.connectors.database_connector import async_engine
+from app.utils.redis_client import redis_binary_client, redis_client
+from app.models.auth_models import LoginResponse
+from app.models.base_response_model import ApiResponse
+from .test_base import TestBase
+
+
+class TestQueryBudget(TestBase):
+    """
+    Statement budgets for the hot list endpoints; a budget that grows with the
+    number of rows returned means an N+1 slipped in.
+    """
+
+    def setup_class(self):
+        # one event loop for the whole class; pooled asyncpg and redis
+        # connections are bound to the loop that opened them, so drop any left
+        # behind by earlier tests
+        async_engine.sync_engine.dispose(close=False)
+        redis_client.connection_pool.reset()
+        redis_binary_client.connection_pool.reset()
+        # no startup warm-up: it would fill the caches these budgets measure,
+        # and concurrent first connects on a disposed async pool deadlock
+        self.warmup_deadline = settings.CACHE_WARMUP_DEADLINE
+        settings.CACHE_WARMUP_DEADLINE = 0
+        self.client = TestClient(app).__enter__()
+        login_result = self.client.post('/login', content=self.superadmin_user_credentials.model_dump_json())
+        login_result.raise_for_status()
+        response = ApiResponse[LoginResponse](**login_result.json())
+        self.client.headers.update({"Authorization": f"Bearer {response.data.access_token}"})
+
+    def teardown_class(self):
+        self.client.__exit__(None, None, None)
+        settings.CACHE_WARMUP_DEADLINE = self.warmup_deadline
+
+    def test_list_users_query_budget(self):
+        self.assert_query_budget("GET", "/users", 2)
+
+    def test_list_users_window_count_query_budget(self):
+        # page and total in one statement, plus creator/updater names
+        response = self.assert_query_budget("GET", "/users?count_mode=window", 2)
+        assert response.json()["total_items"] is not None
+
+    def test_list_users_without_count_query_budget(self):
+        response = self.assert_query_budget("GET", "/users?count_mode=none", 2)
+        assert response.json()["total_items"] is None
+
+    def test_list_students_query_budget(self):
+        self.assert_query_budget("GET", "/students", 2)
+
+    def test_list_syllabus_query_budget(self):
+        self.assert_query_budget("GET", "/syllabus", 1)
+
+    def test_list_guests_query_budget(self):
+        self.assert_query_budget("GET", "/guests", 1)
+
+    def test_list_batches_query_budget(self):
+        # batches, creator/updater names, syllabus of every batch
+        self.assert_query_budget("GET", "/batches", 3)
+
+    def test_conditional_list_syllabus_skips_database(self):
+        etag = self.client.get("/syllabus").headers["etag"]
+        response = self.assert_query_budget("GET", "/syllabus", 0, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_conditional_dashboard_stats_skips_database(self):
+        etag = self.client.get("/dashboard/stats").headers["etag"]
+        response = self.assert_query_budget("GET", "/dashboard/stats", 0, headers={"If-None-Match": etag})
+        assert response.status_code == 304
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from app.config import settings
+from app.utils import rate_limiter
+from app.utils.rate_limiter import _LocalBucket, _store_bucket
+
+
+@pytest.fixture(autouse=True)
+def local_settings(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BATCH", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_SYNC_INTERVAL", 60)
+    rate_limiter._local_buckets.clear()
+    yield
+    rate_limiter._local_buckets.clear()
+
+
+class TestLocalBucket:
+    def test_takes_up_to_a_batch_between_syncs(self):
+        bucket = _LocalBucket(remaining=100, reset_ms=1000)
+        assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+        assert bucket.pending == 3
+
+    def test_leaves_clients_near_their_limit_to_redis(self):
+        bucket = _LocalBucket(remaining=5, reset_ms=1000)
+        assert bucket.take()
+        assert bucket.take()
+        # 3 left after these two, which is no longer more than a batch
+        assert not bucket.take()
+
+    def test_stale_bucket_does_not_admit(self):
+        bucket = _LocalBucket(remaining=100, reset_ms=1000)
+        bucket.synced_at = time.monotonic() - settings.RATE_LIMIT_SYNC_INTERVAL
+        assert not bucket.take()
+
+    def test_exhausted_until_the_window_moves(self):
+        assert _LocalBucket(remaining=0, reset_ms=1000).exhausted()
+        assert not _LocalBucket(remaining=0, reset_ms=0).exhausted()
+        assert not _LocalBucket(remaining=1, reset_ms=1000).exhausted()
+
+    def test_hand_off_resets_pending(self):
+        bucket = _LocalBucket(remaining=100, reset_ms=1000)
+        bucket.take()
+        bucket.take()
+        assert bucket.hand_off() == 2
+        assert bucket.pending == 0
+        assert bucket.hand_off() == 0
+
+
+class TestBucketSync:
+    key = "ratelimit:test:user:1"
+
+    def test_requests_admitted_during_a_sync_carry_over(self):
+        bucket = _store_bucket(self.key, 100, 1000, 60)
+        bucket.take()
+        synced = bucket.hand_off()
+        # admitted by a concurrent check while Redis was being asked
+        bucket.take()
+        bucket.take()
+
+        fresh = _store_bucket(self.key, 99 - synced, 1000, 60)
+        assert synced == 1
+        assert fresh is rate_limiter._local_buckets.get(self.key)
+        assert fresh.pending == 2
+        assert bucket.pending == 0
+
+    def test_carried_requests_count_against_the_next_batch(self):
+        bucket = _store_bucket(self.key, 100, 1000, 60)
+        bucket.take()
+        bucket.take()
+        fresh = _store_bucket(self.key, 100, 1000, 60)
+        assert fresh.take()
+        assert not fresh.take()
+        assert fresh.hand_off() == 3
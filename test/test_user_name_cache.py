@@ -0,0 +1,70 @@
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.connectors.database_connector import async_engine, get_async_database
+from app.entities.user import User
+from app.utils.cache import CacheNamespace, JsonSerializer, invalidate_tags
+from app.utils.lru_cache import LRUCache
+from app.utils.redis_client import redis_binary_client, redis_client
+from app.utils.user_name_cache import UserNameResolver
+
+
+class TestUserNameCache:
+    """
+    A rename is seen by every worker's resolver as soon as its `user:{id}`
+    tag is invalidated, not once their local entries expire.
+    """
+
+    key = "cache:test:user_names"
+    user_id = 1
+
+    def run(self, scenario):
+        # pooled connections are bound to the event loop that opened them
+        async_engine.sync_engine.dispose(close=False)
+        redis_client.connection_pool.reset()
+        redis_binary_client.connection_pool.reset()
+        return asyncio.run(scenario)
+
+    def make_resolver(self) -> UserNameResolver:
+        return UserNameResolver(
+            LRUCache(maxsize=16, ttl=60), expiry=settings.CACHE_EXPIRY_USER_NAME
+        )
+
+    async def rename(self, name: str) -> None:
+        async with get_async_database() as db:
+            await db.execute(update(User).where(User.id == self.user_id).values(name=name))
+            await db.commit()
+        await invalidate_tags(f"user:{self.user_id}")
+
+    def test_rename_reaches_a_list_rebuilt_by_another_worker(self):
+        async def scenario():
+            namespace = CacheNamespace("test", 16, 5, 60, 1)
+            writer, reader = self.make_resolver(), self.make_resolver()
+
+            async def load():
+                async with get_async_database() as db:
+                    return {"name": await reader.get(db, self.user_id)}
+
+            async with get_async_database() as db:
+                original = await db.scalar(select(User.name).where(User.id == self.user_id))
+                assert await writer.get(db, self.user_id) == original
+                # the reading worker has the name in its local tier
+                assert await reader.get(db, self.user_id) == original
+            try:
+                await self.rename(f"{original} renamed")
+                await redis_client.delete(self.key)
+                cached = await namespace.get_or_load(
+                    self.key, load, 60, JsonSerializer(), [f"user:{self.user_id}"]
+                )
+            finally:
+                await self.rename(original)
+                await redis_client.delete(self.key)
+                # leave the name cached for the query budgets of other tests
+                async with get_async_database() as db:
+                    await writer.get(db, self.user_id)
+            return original, cached
+
+        original, cached = self.run(scenario())
+        assert cached == {"name": f"{original} renamed"}